@@ -17,17 +17,83 @@ SPDX-License-Identifier: Apache-2.0
 
 import argparse
 import json
+import os
 import re
 import sys
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterator, Optional, Tuple
 import urllib.request
 import urllib.error
 
 
+# BibTeX patterns, compiled once instead of on every call
+_BIB_SKIP_TYPES = frozenset(('comment', 'string', 'preamble'))
+_BIB_KEY_INVALID_RE = re.compile(r'[\s{}]')
+# doi = { ... } with one level of nested braces
+_DOI_FIELD_RE = re.compile(r'doi\s*=\s*\{((?:[^{}]|(?:\{[^}]*\}))*)\}', re.IGNORECASE)
+_DOI_BRACED_ESCAPED_UNDERSCORE_RE = re.compile(r'\{\\_\}')  # {\_}
+_DOI_BRACED_UNDERSCORE_RE = re.compile(r'\{_\}')  # {_}
+_DOI_ESCAPED_UNDERSCORE_RE = re.compile(r'\\_')  # \_
+
+# Compact encoder for cache lines; json.dumps would build a new encoder on
+# every call whenever non-default options such as separators are passed
+_CACHE_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+# Single-character removal table, applied in one C-level pass
+_BRACE_TABLE = str.maketrans('', '', '{}')
+
+
+def _match_brace(text: str, start: int, end: int) -> int:
+    """Return the index of the '}' closing a brace opened just before start, or -1"""
+    depth = 1
+    while True:
+        close = text.find('}', start, end)
+        if close == -1:
+            return -1
+        opening = text.find('{', start, close)
+        if opening != -1:
+            depth += 1
+            start = opening + 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return close
+            start = close + 1
+
+
+def _iter_bib_entries(bib_content: str) -> Iterator[Tuple[str, str, str]]:
+    """Yield (type, key, fields) for each BibTeX entry in a single forward scan
+    
+    Entries are found with str.find on '@' and delimited by brace matching,
+    so there is no backtracking and an entry may end anywhere on a line.
+    @comment, @string and @preamble blocks are skipped.
+    """
+    pos = bib_content.find('@')
+    while pos != -1:
+        brace = bib_content.find('{', pos + 1)
+        if brace == -1:
+            return
+        
+        # Entry header: @type{key,
+        entry_type = bib_content[pos + 1:brace].strip().lower()
+        comma = bib_content.find(',', brace + 1)
+        key = bib_content[brace + 1:comma].strip() if comma != -1 else ''
+        if (not entry_type.replace('_', '').isalnum() or entry_type in _BIB_SKIP_TYPES
+                or not key or _BIB_KEY_INVALID_RE.search(key)):
+            pos = bib_content.find('@', pos + 1)
+            continue
+        
+        entry_end = _match_brace(bib_content, brace + 1, len(bib_content))
+        if entry_end == -1:
+            return
+        
+        yield entry_type, key, bib_content[comma + 1:entry_end]
+        pos = bib_content.find('@', entry_end + 1)
+
+
 class DOIStatus(Enum):
     """Enum for DOI validation status"""
     Exists = "Exists"
@@ -39,52 +105,159 @@ class DOIStatus(Enum):
 
 
 class DOICache:
-    """Manages caching of DOI validation results"""
+    """Manages caching of DOI validation results
+    
+    The cache file is an append-only log of JSON lines, each mapping DOIs to
+    entries; later lines override earlier ones. Every update is appended
+    immediately, except inside a ``with cache:`` block, where updates are
+    appended once when the block exits. The log is compacted into a single
+    line when it holds more than twice as many records as live entries.
+    """
     
     CACHE_FILE = Path.home() / '.bib_validator'
     CACHE_VALIDITY_DAYS = 30
+    # Identical results stored more recently than this are not rewritten
+    REFRESH_SECONDS = 3600
     
     def __init__(self, verbose: bool = False):
         self.verbose = verbose
-        self.cache: Dict = self._load_cache()
+        self._log_records = 0  # Records in the cache file, including superseded ones
+        self._compact_on_flush = False  # File is not a clean log and must be rewritten
+        self._cache: Optional[Dict] = None  # Loaded from file on first access
+        self._batch_depth = 0  # Nesting level of active with-blocks
+        self._pending: Dict = {}  # DOI -> entry not yet written
+    
+    def __enter__(self) -> 'DOICache':
+        self._batch_depth += 1
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.flush()
+        return False
+    
+    @property
+    def cache(self) -> Dict:
+        """Cached entries by DOI, read from the cache file on first access"""
+        if self._cache is None:
+            self._cache = self._load_cache()
+        return self._cache
+    
+    @cache.setter
+    def cache(self, value: Dict) -> None:
+        self._cache = value
     
     def _load_cache(self) -> Dict:
-        """Load cache from file"""
-        if self.CACHE_FILE.exists():
+        """Load cache from file, replaying the log in order"""
+        if not self.CACHE_FILE.exists():
+            return {}
+        try:
+            with open(self.CACHE_FILE, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except Exception as e:
+            if self.verbose:
+                print(f"Warning: Could not load cache: {e}")
+            return {}
+        
+        # Appending needs every line to be complete JSON ending in a newline
+        self._compact_on_flush = not text.endswith('\n')
+        
+        # A whole-file JSON object is a compacted log or a pre-log
+        # (possibly indented) cache file
+        try:
+            cache = json.loads(text)
+            if isinstance(cache, dict):
+                self._log_records = len(cache)
+                self._compact_on_flush = self._compact_on_flush or text.count('\n') != 1
+                self._migrate_timestamps(cache)
+                return cache
+        except ValueError:
+            pass
+        
+        cache = {}
+        for line in text.splitlines():
             try:
-                with open(self.CACHE_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
+                records = json.loads(line)
+            except ValueError:
+                # Skip lines that are not JSON, e.g. an interrupted append
                 if self.verbose:
-                    print(f"Warning: Could not load cache: {e}")
-                return {}
-        return {}
+                    print("Warning: Skipping unreadable cache line")
+                self._compact_on_flush = True
+                continue
+            if isinstance(records, dict):
+                cache.update(records)
+                self._log_records += len(records)
+        self._migrate_timestamps(cache)
+        return cache
+    
+    def _migrate_timestamps(self, cache: Dict) -> None:
+        """Convert ISO 'timestamp' strings of older cache files to epoch 'ts' floats"""
+        for entry in cache.values():
+            if isinstance(entry, dict) and 'timestamp' in entry and 'ts' not in entry:
+                try:
+                    entry['ts'] = datetime.fromisoformat(entry.pop('timestamp')).timestamp()
+                except (TypeError, ValueError):
+                    pass
+                # Rewrite the file in the new format on the next save
+                self._compact_on_flush = True
     
     def _save_cache(self) -> None:
-        """Save cache to file"""
+        """Save the whole cache to file as a single compacted line
+        
+        The line is encoded in memory, written with one call to a temporary
+        file and moved over the cache file, so a crash never leaves a
+        truncated cache behind.
+        """
+        data = (_CACHE_ENCODER.encode(self.cache) + "\n").encode('utf-8')
+        tmp_file = self.CACHE_FILE.with_name(self.CACHE_FILE.name + '.tmp')
         try:
-            with open(self.CACHE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, indent=2)
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_file, self.CACHE_FILE)
+            self._log_records = len(self.cache)
+            self._compact_on_flush = False
+            self._pending = {}
         except Exception as e:
             print(f"Warning: Could not save cache: {e}")
+            tmp_file.unlink(missing_ok=True)
+    
+    def _append_pending(self) -> None:
+        """Append pending updates to the cache file as one log line"""
+        try:
+            with open(self.CACHE_FILE, 'a', encoding='utf-8') as f:
+                f.write(_CACHE_ENCODER.encode(self._pending) + "\n")
+            self._log_records += len(self._pending)
+            self._pending = {}
+        except Exception as e:
+            print(f"Warning: Could not save cache: {e}")
+    
+    def _mark_dirty(self, doi: str) -> None:
+        """Record an update, saving it now unless writes are batched"""
+        self._pending[doi] = self.cache[doi]
+        if not self._batch_depth:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Save pending updates to file, compacting an oversized log"""
+        if not self._pending:
+            return
+        if self._compact_on_flush or self._log_records + len(self._pending) > 2 * len(self.cache):
+            self._save_cache()
+        else:
+            self._append_pending()
     
     def is_valid(self, doi: str) -> bool:
         """Check if cached DOI result is still valid (within 30 days)"""
-        if doi not in self.cache:
+        cached_entry = self.cache.get(doi)
+        if cached_entry is None:
             return False
         
-        cached_entry = self.cache[doi]
-        if 'timestamp' not in cached_entry:
+        # Epoch seconds compare directly, without parsing a date string
+        ts = cached_entry.get('ts')
+        if not isinstance(ts, (int, float)):
             return False
-        
-        try:
-            cached_date = datetime.fromisoformat(cached_entry['timestamp'])
-            if datetime.now() - cached_date < timedelta(days=self.CACHE_VALIDITY_DAYS):
-                return True
-        except Exception:
-            pass
-        
-        return False
+        return ts > time.time() - self.CACHE_VALIDITY_DAYS * 86400
     
     def is_doi_valid(self, doi: str) -> Optional[bool]:
         """Check if a DOI is valid based on its cached status
@@ -115,26 +288,38 @@ class DOICache:
     
     def set(self, doi: str, is_valid: bool) -> None:
         """Cache a validation result"""
-        self.cache[doi] = {
+        self._store(doi, {
             'is_valid': is_valid,
-            'timestamp': datetime.now().isoformat()
-        }
-        self._save_cache()
+            'ts': time.time()
+        })
     
     def set_status(self, doi: str, status: str) -> None:
         """Cache a validation status (Exists, Validated, NonExists)"""
-        self.cache[doi] = {
+        self._store(doi, {
             'is_valid': status != "NonExists",  # Maintain backward compatibility
             'status': status,
-            'timestamp': datetime.now().isoformat()
-        }
-        self._save_cache()
+            'ts': time.time()
+        })
+    
+    def _store(self, doi: str, entry: Dict) -> None:
+        """Store an entry, skipping the write if a recent identical one exists"""
+        previous = self.cache.get(doi)
+        if (isinstance(previous, dict) and previous.keys() == entry.keys()
+                and isinstance(previous['ts'], (int, float))
+                and entry['ts'] - previous['ts'] < self.REFRESH_SECONDS
+                and all(previous[field] == value for field, value in entry.items() if field != 'ts')):
+            return
+        self.cache[doi] = entry
+        self._mark_dirty(doi)
     
     def clear(self) -> None:
         """Clear the cache"""
         if self.CACHE_FILE.exists():
             self.CACHE_FILE.unlink()
             self.cache = {}
+            self._pending = {}
+            self._log_records = 0
+            self._compact_on_flush = False
 
 
 class DOIValidator:
@@ -150,6 +335,7 @@ class DOIValidator:
         )
         self.entries: Dict[str, Dict[str, str]] = {}
         self.doi_results: Dict[str, Tuple[str, DOIStatus]] = {}  # key -> (doi, status)
+        self._seen_dois: Dict[str, DOIStatus] = {}  # doi -> definitive status determined this run
         self.cache = DOICache(verbose=verbose)
         
     def validate(self) -> None:
@@ -168,7 +354,9 @@ class DOIValidator:
         
         print("Validating DOIs...")
         try:
-            self._validate_dois()
+            # Write cache updates once at the end, including on interruption
+            with self.cache:
+                self._validate_dois()
             self._print_report()
         except KeyboardInterrupt:
             print("\n\n⏸️  Validation interrupted by user (CTRL-C)")
@@ -190,25 +378,21 @@ class DOIValidator:
 
     def _parse_bib_entries(self, bib_content: str) -> None:
         """Parse BibTeX entries and extract DOIs"""
-        # Pattern to match BibTeX entries
-        entry_pattern = r'@(\w+)\s*\{\s*([^,\s]+)\s*,\s*(.*?)\n\s*\}'
-        
-        for match in re.finditer(entry_pattern, bib_content, re.DOTALL):
-            entry_type = match.group(1).lower()
-            key = match.group(2)
-            fields_str = match.group(3)
-            
+        for entry_type, key, fields_str in _iter_bib_entries(bib_content):
+            # Most entries have no DOI; a substring test is far cheaper than the regex
+            if 'doi' not in fields_str.lower():
+                continue
             # Parse DOI field - use a more sophisticated pattern to handle nested braces
             # Match doi = { ... } handling nested braces
-            doi_match = re.search(r'doi\s*=\s*\{((?:[^{}]|(?:\{[^}]*\}))*)\}', fields_str, re.IGNORECASE)
+            doi_match = _DOI_FIELD_RE.search(fields_str)
             if doi_match:
                 doi = doi_match.group(1).strip()
                 # Clean up DOI - remove escaped characters and braces
                 # Handle patterns like {\_}, {\\_}, \_, and remove remaining braces
-                doi = re.sub(r'\{\\_\}', '_', doi)  # {\_} -> _
-                doi = re.sub(r'\{_\}', '_', doi)    # {_} -> _
-                doi = re.sub(r'\\_', '_', doi)      # \_ -> _
-                doi = re.sub(r'[{}]', '', doi)      # Remove any remaining braces
+                doi = _DOI_BRACED_ESCAPED_UNDERSCORE_RE.sub('_', doi)  # {\_} -> _
+                doi = _DOI_BRACED_UNDERSCORE_RE.sub('_', doi)          # {_} -> _
+                doi = _DOI_ESCAPED_UNDERSCORE_RE.sub('_', doi)         # \_ -> _
+                doi = doi.translate(_BRACE_TABLE)                      # Remove any remaining braces
                 self.entries[key] = {'doi': doi, 'entry_type': entry_type}
     
     def _count_all_bib_entries(self) -> Dict[str, str]:
@@ -220,15 +404,7 @@ class DOIValidator:
             with open(self.bib_file, 'r', encoding='latin-1') as f:
                 bib_content = f.read()
         
-        # Pattern to match BibTeX entries
-        entry_pattern = r'@(\w+)\s*\{\s*([^,\s]+)\s*,\s*(.*?)\n\s*\}'
-        entries = {}
-        
-        for match in re.finditer(entry_pattern, bib_content, re.DOTALL):
-            key = match.group(2)
-            entries[key] = match.group(1)
-        
-        return entries
+        return {key: entry_type for entry_type, key, _ in _iter_bib_entries(bib_content)}
     
     def _validate_dois(self) -> None:
         """Validate each DOI by checking if it resolves"""
@@ -239,9 +415,15 @@ class DOIValidator:
         uncached_count = 0
         for i, (key, entry) in enumerate(self.entries.items(), 1):
             doi = entry['doi']
+            checked = False
             
+            # Reuse the result for a DOI that appears more than once in the file
+            if doi in self._seen_dois:
+                status = self._seen_dois[doi]
+                if self.verbose:
+                    print(f"    [VERBOSE] Reusing result for duplicate {doi}: {status.name}")
             # Check cache first - if valid, use it without external check
-            if self.cache.is_valid(doi):
+            elif self.cache.is_valid(doi):
                 cached_status = self.cache.get_status(doi)
                 if self.verbose:
                     print(f"    [VERBOSE] Using cached result for {doi}: {cached_status}")
@@ -256,9 +438,14 @@ class DOIValidator:
                     continue
                 else:
                     status = self._check_doi(doi, key)
+                    checked = True
             else:
                 status = self._check_doi(doi, key)
+                checked = True
             
+            # Errors are transient (network, timeout), so a duplicate retries
+            if status is not DOIStatus.Internal_Error:
+                self._seen_dois[doi] = status
             self.doi_results[key] = (doi, status)
             
             # Map status to emoji
@@ -277,7 +464,7 @@ class DOIValidator:
                 print(f"      → https://doi.org/{doi}")
             
             # Add small delay to be respectful to DOI resolver (only for external checks)
-            if status != DOIStatus.Cached and i < entries_with_doi:
+            if checked and i < entries_with_doi:
                 time.sleep(0.5)
     
     def _check_doi(self, doi: str, key: str) -> DOIStatus:
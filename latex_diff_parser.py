@@ -7,9 +7,22 @@ Blue: added content in second file
 """
 
 import difflib
+import re
 from pathlib import Path
 from typing import List
 
+# Order matters! Try to match longer patterns first
+_TOKEN_RE = re.compile(r'''
+    \\[a-zA-Z]+\*?                    # LaTeX command (e.g., \textbf, \section*)
+    |\\[^a-zA-Z]                       # Single-char commands (e.g., \\, \&, \{)
+    |[\{\}\[\]]                        # Braces and brackets (separate tokens)
+    |\w+                               # Words (letters, digits, underscore)
+    |[ \t]+                            # Horizontal whitespace (keep together)
+    |%[^\n]*\n                         # Comments (% to end of line)
+    |\n                                # Newlines (separate token)
+    |[^\w\s\\{}\[\]%]+                 # Punctuation/special chars
+    ''', re.VERBOSE)
+
 
 def tokenize_latex(text: str) -> List[str]:
     """Split LaTeX into meaningful tokens.
@@ -21,19 +34,7 @@ def tokenize_latex(text: str) -> List[str]:
     - Whitespace (preserved)
     - Punctuation and special characters
     """
-    import re
-    # Order matters! Try to match longer patterns first
-    pattern = r'''
-        \\[a-zA-Z]+\*?                    # LaTeX command (e.g., \textbf, \section*)
-        |\\[^a-zA-Z]                       # Single-char commands (e.g., \\, \&, \{)
-        |[\{\}\[\]]                        # Braces and brackets (separate tokens)
-        |\w+                               # Words (letters, digits, underscore)
-        |[ \t]+                            # Horizontal whitespace (keep together)
-        |%[^\n]*\n                         # Comments (% to end of line)
-        |\n                                # Newlines (separate token)
-        |[^\w\s\\{}\[\]%]+                 # Punctuation/special chars
-        '''
-    return re.findall(pattern, text, re.VERBOSE)
+    return _TOKEN_RE.findall(text)
 
 
 def is_specific(segment: List[str]) -> bool:
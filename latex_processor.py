@@ -13,7 +13,7 @@ Comprehensive LaTeX document processor that handles:
    - Supports two methods:
      * Traditional: \\bibliography{file.bib} - processes at that position
      * BibLaTeX: \\addbibresource{file.bib} + \\printbibliography - processes at \\printbibliography location
-   - Extracts citation keys from \\cite, \\citep, \\citet commands
+   - Extracts citation keys from \\cite, \\citep, \\citet and related natbib/BibLaTeX commands
    - Parses BibTeX (.bib) files
    - Filters to only cited references
    - Converts to inline \\bibitem format with APA-style formatting
@@ -47,15 +47,306 @@ import argparse
 import os
 import re
 import sys
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Any
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, Optional, Set, Tuple, Any
+
+
+# \input{...} and \include{...}
+_INCLUDE_RE = re.compile(r'\\(input|include)\s*\{([^}]+)\}')
+
+# Compiled patterns accept pos/endpos, so context windows around labels and
+# captions are scanned in place instead of slicing the document
+_LABEL_RE = re.compile(r'\\label\{([^}]+)\}')
+_LABEL_ENV_RE = re.compile(
+    r'\\begin\{(figure|table|longtable|supertabular|equation|align|gather|multline|listing|lstlisting)\*?\}'
+)
+_SECTION_RE = re.compile(r'\\(subsubsection|subsection|section)\{')
+_CAPTION_ENV_RE = re.compile(r'\\begin\{(figure|table|longtable|listing|lstlisting)\*?\}')
+# \caption[...]{ up to the opening brace; the text is closed by brace matching
+_CAPTION_RE = re.compile(r'\\caption(?:\[[^\]]*\])?\s*\{')
+_REF_RE = re.compile(r'\\(eq)?ref\{([^}]+)\}')
+_AUTOREF_RE = re.compile(r'\\(autoref|cref|Cref)\{([^}]+)\}')
+
+# Bibliography patterns, compiled once instead of on every call
+_BIBLIOGRAPHY_RE = re.compile(r'\\bibliography\s*\{([^}]+)\}')
+_ADDBIBRESOURCE_RE = re.compile(r'\\addbibresource\s*\{([^}]+)\}\s*')
+_PRINTBIB_RE = re.compile(r'\\printbibliography(?:\[([^\]]+)\])?')
+# Commands to drop and commands to replace, matched in a single scan; the
+# 'drop' group marks \bibliographystyle and \addbibresource occurrences
+_BIB_TRADITIONAL_CMDS_RE = re.compile(
+    r'(?P<drop>\\bibliographystyle\s*\{[^}]+\}\s*)|\\bibliography\s*\{[^}]+\}'
+)
+_BIB_BIBLATEX_CMDS_RE = re.compile(
+    r'(?P<drop>\\addbibresource\s*\{[^}]+\}\s*)|\\printbibliography(?:\[[^\]]+\])?'
+)
+_TITLE_OPT_RE = re.compile(r'title\s*=\s*([^,\]]+)')
+# Possessive quantifiers (stdlib re, Python 3.11+) stop the engine from
+# backtracking into runs that can never be part of a different match
+# One alternation covers natbib (\\citep, \\citeauthor, ...) and BibLaTeX
+# (\\parencite, \\textcite, ...) commands, with up to two optional arguments
+_CITE_RE = re.compile(
+    r'\\(?:no|paren|text|auto|super)?cite(?:author|year|alp|alt|num|p|t)?+\*?+'
+    r'\s*+(?:\[[^\]]*+\])?+\s*+(?:\[[^\]]*+\])?+\s*+\{([^}]++)\}'
+)
+_BIB_SKIP_TYPES = frozenset(('comment', 'string', 'preamble'))
+_BIB_WS_RE = re.compile(r'[ \t\r\n]*+')
+_BIB_KEY_INVALID_RE = re.compile(r'[\s{}]')
+_DOI_ESCAPE_RE = re.compile(r'\{\\\\?_\}')  # {\_} and {\\_}
+_AND_SPLIT_RE = re.compile(r'\s+and\s+')
+
+
+def _read_text(path: Path) -> str:
+    """Read a file once as bytes and decode it as UTF-8, falling back to Latin-1
+    
+    A leading UTF-8 byte order mark is dropped, and newlines are normalized
+    to '\\n' as text-mode reads would do.
+    """
+    with open(path, 'rb') as f:
+        # Hint the kernel to read ahead aggressively; read() then fetches
+        # the whole file in one call sized from fstat
+        if hasattr(os, 'posix_fadvise'):
+            try:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+        raw = f.read()
+    try:
+        text = raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        text = raw.decode('latin-1')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _strip_inner_braces(text: str) -> str:
+    """Remove braces around every innermost {group}, e.g. '{A} {B}' -> 'A B'"""
+    parts = []
+    pos = 0
+    start = text.find('{')
+    while start != -1:
+        close = text.find('}', start + 1)
+        if close == -1:
+            break
+        nested = text.find('{', start + 1, close)
+        if nested != -1:
+            # Not an innermost group; retry from the nested brace
+            start = nested
+            continue
+        parts.append(text[pos:start])
+        parts.append(text[start + 1:close])
+        pos = close + 1
+        start = text.find('{', pos)
+    parts.append(text[pos:])
+    return ''.join(parts)
+
+
+def _parse_bib_text(bib_content: str, wanted_fields: Optional[frozenset] = None,
+                    wanted_keys: Optional[frozenset] = None) -> Dict[str, Dict[str, str]]:
+    """Parse BibTeX entries in a single linear scan over the content
+    
+    Entries are located with str.find on '@' and delimited by brace
+    matching, so each character is visited once. Field values may be
+    braced, quoted or bare (numbers, macros). When wanted_fields is
+    given, other fields are skipped without copying their values; when
+    wanted_keys is given, other entries are skipped without parsing
+    their fields at all.
+    """
+    entries = {}
+    
+    for entry_type, key, _, fields_start, entry_end in _iter_bib_entries(bib_content):
+        if wanted_keys is not None and key not in wanted_keys:
+            continue
+    
+        # Field names and entry types repeat in every entry; interning them
+        # lets all entries share one string object per name
+        fields = {'entry_type': sys.intern(entry_type)}
+        i = fields_start
+        while i < entry_end:
+            eq = bib_content.find('=', i, entry_end)
+            if eq == -1:
+                break
+            field_name = sys.intern(bib_content[i:eq].strip(' \t\r\n,').lower())
+    
+            # Skip whitespace after '='
+            i = _BIB_WS_RE.match(bib_content, eq + 1, entry_end).end()
+            if i >= entry_end:
+                break
+    
+            opener = bib_content[i]
+            if opener == '{':
+                close = _match_brace(bib_content, i + 1, entry_end)
+            elif opener == '"':
+                close = bib_content.find('"', i + 1, entry_end)
+            else:
+                close = -1
+    
+            if close != -1:
+                value_start = i + 1
+            else:
+                # Bare value (number or macro) runs up to the next comma
+                close = bib_content.find(',', i, entry_end)
+                if close == -1:
+                    close = entry_end
+                value_start = i
+            i = close + 1
+    
+            if wanted_fields is not None and field_name not in wanted_fields:
+                continue
+    
+            # Clean up field value
+            fields[field_name] = ' '.join(bib_content[value_start:close].split())
+    
+        entries[key] = fields
+    
+    return entries
+
+
+def _iter_bib_entries(bib_content: str) -> Iterator[Tuple[str, str, int, int, int]]:
+    """Yield (type, key, start, fields start, end) for each BibTeX entry
+    
+    start is the index of the '@' and end the index of the closing brace,
+    found by brace matching so entries may end anywhere on a line.
+    @comment, @string and @preamble blocks are skipped.
+    """
+    pos = bib_content.find('@')
+    while pos != -1:
+        next_pos = pos + 1
+        brace = bib_content.find('{', next_pos)
+        if brace == -1:
+            return
+    
+        # Entry header: @type{key,
+        entry_type = bib_content[next_pos:brace].strip().lower()
+        comma = bib_content.find(',', brace + 1)
+        key = bib_content[brace + 1:comma].strip() if comma != -1 else ''
+        if (not entry_type.replace('_', '').isalnum() or entry_type in _BIB_SKIP_TYPES
+                or not key or _BIB_KEY_INVALID_RE.search(key)):
+            pos = bib_content.find('@', next_pos)
+            continue
+    
+        entry_end = _match_brace(bib_content, brace + 1, len(bib_content))
+        if entry_end == -1:
+            return
+    
+        yield entry_type, key, pos, comma + 1, entry_end
+        pos = bib_content.find('@', entry_end + 1)
+
+
+def _match_brace(text: str, start: int, end: int) -> int:
+    """Return the index of the '}' closing a brace opened just before start, or -1"""
+    depth = 1
+    while True:
+        close = text.find('}', start, end)
+        if close == -1:
+            return -1
+        opening = text.find('{', start, close)
+        if opening != -1:
+            depth += 1
+            start = opening + 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return close
+            start = close + 1
+
+
+def _format_apa_article(parts: List[str], entry: Mapping[str, str], title: str) -> None:
+    """Append the APA article part: Title. Journal, Volume(Number), pages."""
+    journal = entry.get('journal', '')
+    volume = entry.get('volume', '')
+    number = entry.get('number', '')
+    pages = entry.get('pages', '')
+    
+    if title:
+        parts.append(f"{title}. ")
+    if journal:
+        parts.append(f" \\textit{{{journal}}}")
+        if volume:
+            parts.append(f", {volume}")
+            if number:
+                parts.append(f"({number})")
+        if pages:
+            parts.append(f", {pages}")
+        parts.append(".")
+
+
+def _format_apa_book(parts: List[str], entry: Mapping[str, str], title: str) -> None:
+    """Append the APA book part: Title. Publisher: Address."""
+    publisher = entry.get('publisher', '')
+    address = entry.get('address', '')
+    
+    if title:
+        parts.append(f"\\textit{{{title}}}. ")
+    if publisher:
+        parts.append(f" {publisher}")
+        if address:
+            parts.append(f": {address}")
+        parts.append(".")
+
+
+def _format_apa_proceedings(parts: List[str], entry: Mapping[str, str], title: str) -> None:
+    """Append the APA proceedings/collection part: Title. In Booktitle (pp. pages)."""
+    booktitle = entry.get('booktitle', '')
+    pages = entry.get('pages', '')
+    
+    if title:
+        parts.append(f"{title}. ")
+    if booktitle:
+        parts.append(f"In \\textit{{{booktitle}}}")
+        if pages:
+            parts.append(f" (pp. {pages})")
+        parts.append(".")
+
+
+def _format_apa_techreport(parts: List[str], entry: Mapping[str, str], title: str) -> None:
+    """Append the APA technical report part: Title. Technical Report, Institution."""
+    if title:
+        parts.append(f"{title}.")
+    parts.append(" Technical Report")
+    institution = entry.get('institution', '')
+    if institution:
+        parts.append(f", {institution}")
+    parts.append(".")
+
+
+# Fields read by the APA formatters; others are skipped when parsing .bib files
+_APA_FIELDS = frozenset((
+    'author', 'title', 'year', 'doi', 'journal', 'volume', 'number', 'pages',
+    'publisher', 'address', 'booktitle', 'institution',
+))
+
+# Entry type -> formatter for the type-specific part of an APA bibitem
+_APA_FORMATTERS = {
+    'article': _format_apa_article,
+    'book': _format_apa_book,
+    'inproceedings': _format_apa_proceedings,
+    'conference': _format_apa_proceedings,
+    'incollection': _format_apa_proceedings,
+    'techreport': _format_apa_techreport,
+}
 
 
 class LaTeXProcessor:
+    # Parsed .bib files are shared by all processors in the process, so
+    # repeated runs (tests, watch loops) skip unchanged files; results are
+    # read-only views, and least recently used ones are dropped beyond
+    # BIB_CACHE_SIZE
+    BIB_CACHE_SIZE = 32
+    _bib_cache: Dict[Tuple[str, int, int, Optional[frozenset]], Mapping[str, Mapping[str, str]]] = {}  # (abs path, mtime, size, keys) -> entries
+    # Formatted bibitems are shared the same way and bounded by
+    # BIBITEM_CACHE_SIZE; a result is reused only for the very entry object
+    # it was formatted from
+    BIBITEM_CACHE_SIZE = 4096
+    _bibitem_cache: Dict[str, Tuple[Mapping[str, str], str]] = {}  # key -> (entry, formatted \bibitem)
+    
     def __init__(self, main_file: str, output_file: str = "onefile.tex", verbose: bool = False, mode: str = "all"):
         self.main_file = Path(main_file)
         self.base_dir = self.main_file.parent
-        self.processed_files: Set[Path] = set()
+        self.processed_files: Set[str] = set()  # os.fspath() of every file read
+        self._dir_listings: Dict[Path, Set[str]] = {}  # directory -> file names, scanned once per run
         self.cited_keys: List[str] = []
         self.bib_file: Path = None
         self.verbose = verbose
@@ -80,8 +371,8 @@ class LaTeXProcessor:
         self.labels: Dict[str, Dict[str, Any]] = {}  # label -> {type, context, file, position}
         self.references: List[Dict[str, Any]] = []  # [{ref, type, file, position}]
         self.label_contexts: Dict[str, str] = {}  # label -> surrounding context
-        self.all_label_occurrences: Dict[str, List[Dict[str, Any]]] = {}  # Track ALL occurrences including duplicates
-        self.processed_content: str = ""  # Store processed content for caption extraction
+        self.all_label_occurrences: Dict[str, List[Dict[str, Any]]] = defaultdict(list)  # Track ALL occurrences including duplicates
+        self.captions: Dict[str, Dict[str, Any]] = {}  # label -> caption info, filled during label extraction
         
     def process(self) -> None:
         """Main processing function"""
@@ -101,14 +392,11 @@ class LaTeXProcessor:
         self._extract_labels_and_refs(content)
         
         # Pass 3: Process bibliography
-        content = self._process_bibliography(content)
+        pieces = self._process_bibliography(content)
         
-        # Store for later use (caption extraction)
-        self.processed_content = content
-        
-        # Write output
+        # Write output piece by piece, without joining the document first
         with open(self.output_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+            f.writelines(pieces)
             
         print(f"Successfully created {self.output_file}")
         
@@ -142,22 +430,19 @@ class LaTeXProcessor:
             issues.append(f"⚠️  {len(duplicates)} duplicate label(s)")
         
         # Check for undefined references
-        undefined_refs = [ref for ref in self.references if ref['ref'] not in self.labels]
+        undefined_refs = self.undefined_refs
         if undefined_refs:
             issues.append(f"⚠️  {len(undefined_refs)} undefined reference(s)")
         
         # Check for unused labels
-        referenced_labels = set(ref['ref'] for ref in self.references)
-        unused_labels = set(self.labels.keys()) - referenced_labels
+        unused_labels = self.unused_labels
         if unused_labels:
             issues.append(f"⚠️  {len(unused_labels)} unused label(s)")
         
         # Check for missing captions
-        if self.processed_content:
-            captions = self.extract_captions(self.processed_content)
-            missing_captions = [label for label, info in captions.items() if not info['has_caption']]
-            if missing_captions:
-                issues.append(f"⚠️  {len(missing_captions)} label(s) without captions")
+        missing_captions = [label for label, info in self.captions.items() if not info['has_caption']]
+        if missing_captions:
+            issues.append(f"⚠️  {len(missing_captions)} label(s) without captions")
         
         if issues:
             print(f"\n{'='*60}")
@@ -181,7 +466,7 @@ class LaTeXProcessor:
         self._extract_citation_keys(content)
         
         # Find and read bibliography file
-        bib_match = re.search(r'\\bibliography\s*\{([^}]+)\}', content)
+        bib_match = _BIBLIOGRAPHY_RE.search(content) if '\\bibliography' in content else None
         if not bib_match:
             print("No \\bibliography command found")
             return
@@ -195,16 +480,13 @@ class LaTeXProcessor:
             print(f"Error: Bibliography file not found: {self.bib_file}")
             return
         
-        # Read original BibTeX file
-        try:
-            with open(self.bib_file, 'r', encoding='utf-8') as f:
-                bib_content = f.read()
-        except UnicodeDecodeError:
-            with open(self.bib_file, 'r', encoding='latin-1') as f:
-                bib_content = f.read()
-        
-        # Extract referenced entries
-        referenced_entries = self._extract_referenced_bibtex_entries(bib_content, self.cited_keys)
+        # Read original BibTeX file and extract referenced entries, skipping
+        # the read entirely when no keys are cited
+        if self.cited_keys:
+            bib_content = _read_text(self.bib_file)
+            referenced_entries = self._extract_referenced_bibtex_entries(bib_content, self.cited_keys)
+        else:
+            referenced_entries = ''
         
         # Write output
         with open(self.output_file, 'w', encoding='utf-8') as f:
@@ -214,83 +496,138 @@ class LaTeXProcessor:
         print(f"Extracted {len(self.cited_keys)} referenced entries")
     
     def _extract_referenced_bibtex_entries(self, bib_content: str, keys: List[str]) -> str:
-        """Extract and return original BibTeX entries for specified keys"""
-        entries = []
+        """Extract and return original BibTeX entries for specified keys
         
-        # Pattern to match BibTeX entries
-        entry_pattern = r'@(\w+)\s*\{\s*([^,\s]+)\s*,\s*(.*?)\n\s*\}'
-        
-        for key in keys:
-            for match in re.finditer(entry_pattern, bib_content, re.DOTALL):
-                entry_key = match.group(2)
-                if entry_key == key:
-                    entries.append(match.group(0))
+        The .bib content is scanned once to index the raw text of the wanted
+        entries, then entries are emitted in the order of keys.
+        """
+        wanted = set(keys)
+        index = {}
+        for _, entry_key, start, _, entry_end in _iter_bib_entries(bib_content):
+            # The first entry for a key wins
+            if entry_key in wanted and entry_key not in index:
+                index[entry_key] = bib_content[start:entry_end + 1]
+                if len(index) == len(wanted):
                     break
-            else:
-                print(f"Warning: Entry '{key}' not found in bibliography")
         
-        return '\n\n'.join(entries)
+        # Report all missing keys with a single write
+        missing = [key for key in keys if key not in index]
+        if missing:
+            print(f"Warning: {len(missing)} entries not found in bibliography: {', '.join(missing)}")
+        
+        return '\n\n'.join([index[key] for key in keys if key in index])
     
     def _process_includes(self, file_path: Path, depth: int = 0) -> str:
-        """Recursively process \\input and \\include commands"""
-        if depth > 50:  # Prevent infinite recursion
-            raise RecursionError(f"Maximum inclusion depth exceeded for {file_path}")
-            
-        if file_path in self.processed_files:
-            print(f"Warning: Circular inclusion detected for {file_path}")
-            return f"% Circular inclusion: {file_path}\n"
-            
-        self.processed_files.add(file_path)
+        """Process \\input and \\include commands, expanding included files in place
         
-        if not file_path.exists():
-            print(f"Warning: File not found: {file_path}")
-            return f"% File not found: {file_path}\n"
+        Nested files are walked with an explicit stack of open files instead
+        of recursion. All levels append to one parts list, so included text
+        is copied once by the final join.
+        """
+        parts: List[str] = []
+        content = self._read_include(file_path, depth, parts)
+        if content is None:
+            return ''.join(parts)
+        
+        # Frames of [file, content, include matches, position after last match]
+        stack = [[file_path, content, _INCLUDE_RE.finditer(content), 0]]
+        while stack:
+            frame = stack[-1]
+            current, content, matches, pos = frame
+            match = next(matches, None)
+            if match is None:
+                # Current file is done; close it and resume its parent
+                parts.append(content[pos:])
+                stack.pop()
+                if stack:
+                    parts.append(f"\n% End included file: {current.name}\n")
+                continue
             
-        print("  " * depth + f"Processing: {file_path}")
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            try:
-                with open(file_path, 'r', encoding='latin-1') as f:
-                    content = f.read()
-            except Exception as e:
-                print(f"Error reading {file_path}: {e}")
-                return f"% Error reading file: {file_path}\n"
-        
-        # Process \input{file} and \include{file}
-        def replace_include(match):
-            command = match.group(1)  # 'input' or 'include'
+            parts.append(content[pos:match.start()])
+            frame[3] = match.end()
+            
+            # Process \input{file} and \include{file}
             filename = match.group(2).strip()
             
             # Add .tex extension if not present
-            if not filename.endswith('.tex'):
-                tex_file = self.base_dir / f"{filename}.tex"
-            else:
-                tex_file = self.base_dir / filename
-                
-            # Try relative to current file if not found
-            if not tex_file.exists():
-                current_dir = file_path.parent
-                if not filename.endswith('.tex'):
-                    tex_file = current_dir / f"{filename}.tex"
-                else:
-                    tex_file = current_dir / filename
+            tex_name = filename if filename.endswith('.tex') else f"{filename}.tex"
+            
+            # Try relative to the main file, then relative to the current file
+            tex_file = self._resolve_include((self.base_dir, current.parent), tex_name)
             
-            if tex_file.exists():
-                included_content = self._process_includes(tex_file, depth + 1)
-                return f"\n% Begin included file: {tex_file.name}\n{included_content}\n% End included file: {tex_file.name}\n"
+            if tex_file is not None:
+                parts.append(f"\n% Begin included file: {tex_file.name}\n")
+                included = self._read_include(tex_file, depth + len(stack), parts)
+                if included is not None:
+                    stack.append([tex_file, included, _INCLUDE_RE.finditer(included), 0])
+                else:
+                    parts.append(f"\n% End included file: {tex_file.name}\n")
             else:
                 print(f"Warning: Included file not found: {filename}")
-                return f"% File not found: {filename}\n"
+                parts.append(f"% File not found: {filename}\n")
         
-        # Match \input{...} and \include{...}
-        include_pattern = r'\\(input|include)\s*\{([^}]+)\}'
-        content = re.sub(include_pattern, replace_include, content)
+        return ''.join(parts)
+    
+    def _read_include(self, file_path: Path, depth: int, parts: List[str]) -> Optional[str]:
+        """Read a file to be expanded, or append a comment to parts and return None"""
+        if depth > 50:  # Prevent infinite recursion
+            raise RecursionError(f"Maximum inclusion depth exceeded for {file_path}")
+            
+        # str keys hash once and are cached, unlike Path's normalized parts
+        file_key = os.fspath(file_path)
+        if file_key in self.processed_files:
+            print(f"Warning: Circular inclusion detected for {file_path}")
+            parts.append(f"% Circular inclusion: {file_path}\n")
+            return None
+            
+        self.processed_files.add(file_key)
         
+        # Opening directly instead of checking exists() first saves a stat()
+        # per include and accepts whatever names the filesystem resolves
+        try:
+            content = _read_text(file_path)
+        except FileNotFoundError:
+            print(f"Warning: File not found: {file_path}")
+            parts.append(f"% File not found: {file_path}\n")
+            return None
+        except OSError as e:
+            print(f"Error reading {file_path}: {e}")
+            parts.append(f"% Error reading file: {file_path}\n")
+            return None
+            
+        print("  " * depth + f"Processing: {file_path}")
         return content
     
+    def _resolve_include(self, directories: Tuple[Path, ...], name: str) -> Optional[Path]:
+        """Return the path of name in the first directory that has it, or None
+        
+        Listed names are found with a set probe and no stat(). Listings
+        compare names exactly, so only a name missing from every listing is
+        checked with exists(), which still finds case or normalization
+        variants on macOS and Windows filesystems.
+        """
+        for directory in directories:
+            if self._dir_has(directory, name):
+                return directory / name
+        for directory in dict.fromkeys(directories):
+            path = directory / name
+            if path.exists():
+                return path
+        return None
+    
+    def _dir_has(self, directory: Path, name: str) -> bool:
+        """Check whether a directory lists a file with exactly this name"""
+        path = directory / name
+        listing = self._dir_listings.get(path.parent)
+        if listing is None:
+            try:
+                with os.scandir(path.parent) as entries:
+                    listing = {entry.name for entry in entries}
+            except OSError:
+                listing = set()
+            self._dir_listings[path.parent] = listing
+        return path.name in listing
+    
     def _extract_labels_and_refs(self, content: str) -> None:
         """Extract all labels and references from the content"""
         # Extract labels with context
@@ -298,14 +635,25 @@ class LaTeXProcessor:
         
         # Extract references
         self._extract_references(content)
+        
+        # Associate captions with the labels found above
+        self.captions = self.extract_captions(content)
+    
+    @property
+    def undefined_refs(self) -> List[Dict[str, Any]]:
+        """References to labels that are never defined, computed on access"""
+        labels = self.labels
+        return [ref for ref in self.references if ref['ref'] not in labels]
+    
+    @property
+    def unused_labels(self) -> Set[str]:
+        """Labels that are never referenced, computed on access"""
+        return self.labels.keys() - {ref['ref'] for ref in self.references}
     
     def _extract_labels(self, content: str) -> None:
         r"""Extract all \label{} commands and their context"""
-        # Pattern to match \label{labelname}
-        label_pattern = r'\\label\{([^}]+)\}'
-        
         # Find all labels with their positions
-        for match in re.finditer(label_pattern, content):
+        for match in _LABEL_RE.finditer(content):
             label_name = match.group(1)
             position = match.start()
             
@@ -318,9 +666,6 @@ class LaTeXProcessor:
             label_type = self._determine_label_type(content, position)
             
             # Track ALL occurrences for duplicate detection
-            if label_name not in self.all_label_occurrences:
-                self.all_label_occurrences[label_name] = []
-            
             self.all_label_occurrences[label_name].append({
                 'type': label_type,
                 'context': context,
@@ -340,18 +685,17 @@ class LaTeXProcessor:
         """Determine the type of label based on surrounding context"""
         # Look backwards from the label position to find the environment or command
         context_start = max(0, position - 500)
-        preceding_text = content[context_start:position]
         
         # Find all environment beginnings and their positions
         environments = []
         
-        for match in re.finditer(r'\\begin\{(figure|table|longtable|supertabular|equation|align|gather|multline|listing|lstlisting)\*?\}', preceding_text):
+        for match in _LABEL_ENV_RE.finditer(content, context_start, position):
             env_type = match.group(1)
             env_pos = match.start()
             environments.append((env_pos, env_type))
         
         # Find section commands
-        for match in re.finditer(r'\\(subsubsection|subsection|section)\{', preceding_text):
+        for match in _SECTION_RE.finditer(content, context_start, position):
             section_type = match.group(1)
             section_pos = match.start()
             environments.append((section_pos, section_type))
@@ -383,8 +727,7 @@ class LaTeXProcessor:
                 return env_map[closest_env]
         
         # Check label prefix as a fallback
-        following_text = content[position:min(len(content), position + 100)]
-        label_match = re.search(r'\\label\{([^}]+)\}', following_text)
+        label_match = _LABEL_RE.search(content, position, position + 100)
         if label_match:
             label_name = label_match.group(1)
             if label_name.startswith('fig:'):
@@ -403,10 +746,8 @@ class LaTeXProcessor:
     
     def _extract_references(self, content: str) -> None:
         r"""Extract all \ref{} and \eqref{} commands"""
-        # Pattern to match \ref{}, \eqref{}, \autoref{}, \cref{}, etc.
-        ref_pattern = r'\\(eq)?ref\{([^}]+)\}'
-        
-        for match in re.finditer(ref_pattern, content):
+        # Match \ref{} and \eqref{}
+        for match in _REF_RE.finditer(content):
             ref_type = 'eqref' if match.group(1) else 'ref'
             ref_name = match.group(2)
             
@@ -417,9 +758,7 @@ class LaTeXProcessor:
             })
         
         # Also match \autoref{} and \cref{} variants
-        autoref_pattern = r'\\(autoref|cref|Cref)\{([^}]+)\}'
-        
-        for match in re.finditer(autoref_pattern, content):
+        for match in _AUTOREF_RE.finditer(content):
             ref_type = match.group(1)
             ref_name = match.group(2)
             
@@ -436,12 +775,9 @@ class LaTeXProcessor:
         print("="*60)
         
         # Group labels by type
-        labels_by_type = {}
+        labels_by_type = defaultdict(list)
         for label, info in self.labels.items():
-            label_type = info['type']
-            if label_type not in labels_by_type:
-                labels_by_type[label_type] = []
-            labels_by_type[label_type].append(label)
+            labels_by_type[info['type']].append(label)
         
         # Print labels by type
         print("\nLabels found:")
@@ -453,12 +789,7 @@ class LaTeXProcessor:
         
         # Check for undefined references
         print("\nReference validation:")
-        undefined_refs = []
-        for ref_info in self.references:
-            ref_name = ref_info['ref']
-            if ref_name not in self.labels:
-                undefined_refs.append(ref_info)
-        
+        undefined_refs = self.undefined_refs
         if undefined_refs:
             print(f"  WARNING: {len(undefined_refs)} undefined reference(s):")
             for ref_info in undefined_refs:
@@ -467,9 +798,7 @@ class LaTeXProcessor:
             print(f"  All {len(self.references)} references are defined ✓")
         
         # Check for unused labels
-        referenced_labels = set(ref_info['ref'] for ref_info in self.references)
-        unused_labels = set(self.labels.keys()) - referenced_labels
-        
+        unused_labels = self.unused_labels
         if unused_labels:
             print(f"\n  WARNING: {len(unused_labels)} unused label(s):")
             for label in sorted(unused_labels):
@@ -485,37 +814,22 @@ class LaTeXProcessor:
         print()
         
         # Report caption associations
-        if self.processed_content:
-            print(self.get_caption_report(self.processed_content))
-            print()
+        print(self.get_caption_report())
+        print()
     
     def get_label_stats(self) -> Dict[str, Any]:
         """Get statistics about labels and references"""
         # Group labels by type
-        labels_by_type = {}
+        labels_by_type = defaultdict(list)
         for label, info in self.labels.items():
-            label_type = info['type']
-            if label_type not in labels_by_type:
-                labels_by_type[label_type] = []
-            labels_by_type[label_type].append(label)
-        
-        # Find undefined references
-        undefined_refs = []
-        for ref_info in self.references:
-            ref_name = ref_info['ref']
-            if ref_name not in self.labels:
-                undefined_refs.append(ref_info)
-        
-        # Find unused labels
-        referenced_labels = set(ref_info['ref'] for ref_info in self.references)
-        unused_labels = set(self.labels.keys()) - referenced_labels
+            labels_by_type[info['type']].append(label)
         
         return {
             'total_labels': len(self.labels),
             'total_references': len(self.references),
-            'labels_by_type': labels_by_type,
-            'undefined_references': undefined_refs,
-            'unused_labels': list(unused_labels),
+            'labels_by_type': dict(labels_by_type),
+            'undefined_references': self.undefined_refs,
+            'unused_labels': list(self.unused_labels),
             'all_labels': self.labels,
             'all_references': self.references
         }
@@ -529,13 +843,12 @@ class LaTeXProcessor:
             with position and context information. Only includes labels that appear
             more than once.
         """
-        duplicates = {}
-        
-        for label_name, occurrences in self.all_label_occurrences.items():
-            if len(occurrences) > 1:
-                duplicates[label_name] = occurrences
-        
-        return duplicates
+        # Occurrences were grouped per label while extracting, in one pass
+        return {
+            label_name: occurrences
+            for label_name, occurrences in self.all_label_occurrences.items()
+            if len(occurrences) > 1
+        }
     
     def get_duplicate_labels_report(self) -> str:
         """
@@ -591,31 +904,24 @@ class LaTeXProcessor:
         """
         caption_data = {}
         
-        # Pattern to match \caption{...} with nested braces support
-        caption_pattern = r'\\caption(?:\[[^\]]*\])?\s*\{((?:[^{}]|(?:\{[^}]*\}))*)\}'
-        
-        # Find all captions
-        for caption_match in re.finditer(caption_pattern, content):
-            caption_text = caption_match.group(1).strip()
+        # Find all captions; brace matching allows any nesting depth
+        for caption_match in _CAPTION_RE.finditer(content):
+            caption_end = _match_brace(content, caption_match.end(), len(content))
+            if caption_end == -1:
+                continue
+            caption_text = content[caption_match.end():caption_end].strip()
             caption_pos = caption_match.start()
             
-            # Look for a label within 500 characters after the caption
-            search_start = caption_pos
-            search_end = min(len(content), caption_pos + 500)
-            search_region = content[search_start:search_end]
-            
             # Find the environment this caption belongs to
             # Search backwards to find \begin{figure}, \begin{table}, etc.
-            preceding_text = content[max(0, caption_pos - 500):caption_pos]
-            
-            # Find ALL matches and take the last one (closest to caption)
-            env_matches = list(re.finditer(
-                r'\\begin\{(figure|table|longtable|listing|lstlisting)\*?\}',
-                preceding_text
-            ))
-            
-            if env_matches:
-                env_type = env_matches[-1].group(1)  # Get the LAST match
+            # Keep a rolling last match (closest to caption) instead of
+            # materializing every match just to index the final one
+            last_env_match = None
+            for last_env_match in _CAPTION_ENV_RE.finditer(content, max(0, caption_pos - 500), caption_pos):
+                pass
+
+            if last_env_match:
+                env_type = last_env_match.group(1)
             else:
                 env_type = 'unknown'
                 
@@ -624,8 +930,8 @@ class LaTeXProcessor:
             elif env_type in ('lstlisting',):
                 env_type = 'listing'
             
-            # Find associated label (should be near the caption)
-            label_match = re.search(r'\\label\{([^}]+)\}', search_region)
+            # Find associated label within 500 characters after the caption
+            label_match = _LABEL_RE.search(content, caption_pos, caption_pos + 500)
             
             if label_match:
                 label_name = label_match.group(1)
@@ -634,7 +940,7 @@ class LaTeXProcessor:
                     'type': env_type,
                     'has_caption': True,
                     'position': caption_pos,
-                    'label_position': search_start + label_match.start()
+                    'label_position': label_match.start()
                 }
         
         # Now find labels without captions (in figure/table/listing environments)
@@ -652,17 +958,18 @@ class LaTeXProcessor:
         
         return caption_data
     
-    def get_caption_report(self, content: str) -> str:
+    def get_caption_report(self, content: Optional[str] = None) -> str:
         """
         Generate a human-readable report of captions and their labels.
         
         Args:
-            content: LaTeX document content
+            content: LaTeX document content; when omitted, the captions
+                collected during label extraction are reported
             
         Returns:
             Formatted string report
         """
-        caption_data = self.extract_captions(content)
+        caption_data = self.captions if content is None else self.extract_captions(content)
         
         report_lines = []
         report_lines.append("=" * 60)
@@ -670,12 +977,9 @@ class LaTeXProcessor:
         report_lines.append("=" * 60)
         
         # Group by type
-        by_type = {}
+        by_type = defaultdict(list)
         for label, info in caption_data.items():
-            env_type = info['type']
-            if env_type not in by_type:
-                by_type[env_type] = []
-            by_type[env_type].append((label, info))
+            by_type[info['type']].append((label, info))
         
         # Report for each type
         for env_type in sorted(by_type.keys()):
@@ -705,18 +1009,21 @@ class LaTeXProcessor:
         report_lines.append("=" * 60)
         return "\n".join(report_lines)
     
-    def _process_bibliography(self, content: str) -> str:
+    def _process_bibliography(self, content: str) -> List[str]:
         r"""Process bibliography: extract citations and inline bibliography
         
+        Returns the output as a list of string pieces to be written in order.
+        
         Supports two methods:
         1. Traditional: \bibliography{file.bib} - inline at that position
         2. BibLaTeX style: \addbibresource{file.bib} + \printbibliography[title=...] 
            - find file from \addbibresource, replace \printbibliography with output
         """
-        # Check which bibliography method is used
-        has_addbibresource = bool(re.search(r'\\addbibresource\s*\{([^}]+)\}', content))
-        has_printbibliography = bool(re.search(r'\\printbibliography', content))
-        has_bibliography = bool(re.search(r'\\bibliography\s*\{([^}]+)\}', content))
+        # Check which bibliography method is used; the substring tests skip
+        # the regex engine entirely for documents without these commands
+        has_addbibresource = '\\addbibresource' in content and bool(_ADDBIBRESOURCE_RE.search(content))
+        has_printbibliography = '\\printbibliography' in content
+        has_bibliography = '\\bibliography' in content and bool(_BIBLIOGRAPHY_RE.search(content))
         
         # Determine which method to use
         if has_addbibresource and has_printbibliography:
@@ -727,15 +1034,15 @@ class LaTeXProcessor:
             return self._process_bibliography_traditional(content)
         else:
             print("No bibliography command found")
-            return content
+            return [content]
     
-    def _process_bibliography_traditional(self, content: str) -> str:
+    def _process_bibliography_traditional(self, content: str) -> List[str]:
         """Process traditional \bibliography{file.bib} command"""
         # Find bibliography file
-        bib_match = re.search(r'\\bibliography\s*\{([^}]+)\}', content)
+        bib_match = _BIBLIOGRAPHY_RE.search(content)
         if not bib_match:
             print("No \\bibliography command found")
-            return content
+            return [content]
             
         bib_filename = bib_match.group(1)
         if not bib_filename.endswith('.bib'):
@@ -744,38 +1051,30 @@ class LaTeXProcessor:
         self.bib_file = self.base_dir / bib_filename
         if not self.bib_file.exists():
             print(f"Warning: Bibliography file not found: {self.bib_file}")
-            return content
+            return [content]
         
         # Extract all citation keys
         self._extract_citation_keys(content)
         
-        # Parse bibliography
-        bib_entries = self._parse_bib_file()
+        # Parse only the cited entries; nothing to look up when no keys are cited
+        bib_entries = self._parse_bib_file(frozenset(self.cited_keys)) if self.cited_keys else {}
         
         # Filter and convert to \bibitem
-        bibitem_content = self._create_bibitem_content(bib_entries)
-        
-        # Replace \bibliography with \begin{thebibliography}
-        bibliography_replacement = f"""\\begin{{thebibliography}}{{99}}
-{bibitem_content}
-\\end{{thebibliography}}"""
-        
-        # Remove \bibliographystyle if present
-        content = re.sub(r'\\bibliographystyle\s*\{[^}]+\}\s*', '', content)
+        bibitem_pieces = self._bibitem_pieces(bib_entries)
         
-        # Replace \bibliography - escape backslashes for regex replacement
-        escaped_replacement = bibliography_replacement.replace('\\', r'\\')
-        content = re.sub(r'\\bibliography\s*\{[^}]+\}', escaped_replacement, content)
-        
-        return content
+        # Remove \bibliographystyle and replace \bibliography with
+        # \begin{thebibliography}
+        return self._splice_bibliography(
+            content, _BIB_TRADITIONAL_CMDS_RE, "\\begin{thebibliography}{99}\n", bibitem_pieces
+        )
     
-    def _process_bibliography_biblatex(self, content: str) -> str:
+    def _process_bibliography_biblatex(self, content: str) -> List[str]:
         r"""Process BibLaTeX-style \addbibresource{} and \printbibliography commands"""
         # Find bibliography file from \addbibresource
-        bib_match = re.search(r'\\addbibresource\s*\{([^}]+)\}', content)
+        bib_match = _ADDBIBRESOURCE_RE.search(content)
         if not bib_match:
             print("No \\addbibresource command found")
-            return content
+            return [content]
             
         bib_filename = bib_match.group(1)
         if not bib_filename.endswith('.bib'):
@@ -784,151 +1083,148 @@ class LaTeXProcessor:
         self.bib_file = self.base_dir / bib_filename
         if not self.bib_file.exists():
             print(f"Warning: Bibliography file not found: {self.bib_file}")
-            return content
+            return [content]
         
         # Extract all citation keys
         self._extract_citation_keys(content)
         
-        # Parse bibliography
-        bib_entries = self._parse_bib_file()
+        # Parse only the cited entries; nothing to look up when no keys are cited
+        bib_entries = self._parse_bib_file(frozenset(self.cited_keys)) if self.cited_keys else {}
         
         # Filter and convert to \bibitem
-        bibitem_content = self._create_bibitem_content(bib_entries)
+        bibitem_pieces = self._bibitem_pieces(bib_entries)
         
         # Find \printbibliography command and extract title if present
-        print_bib_pattern = r'\\printbibliography(?:\[([^\]]+)\])?'
-        print_bib_match = re.search(print_bib_pattern, content)
+        print_bib_match = _PRINTBIB_RE.search(content)
         
         if not print_bib_match:
             print("No \\printbibliography command found")
-            return content
+            return [content]
         
         # Extract title from options if present
         title = "References"  # Default title
         if print_bib_match.group(1):
             options = print_bib_match.group(1)
-            title_match = re.search(r'title\s*=\s*([^,\]]+)', options)
+            title_match = _TITLE_OPT_RE.search(options)
             if title_match:
                 title = title_match.group(1).strip()
         
-        # Create replacement with \reftitle and \begin{thebibliography}
-        bibliography_replacement = f"""\\reftitle{{{title}}}
-\\begin{{thebibliography}}{{99}}
-{bibitem_content}
-\\end{{thebibliography}}"""
-        
-        # Remove \addbibresource command(s)
-        content = re.sub(r'\\addbibresource\s*\{[^}]+\}\s*', '', content)
-        
-        # Replace \printbibliography with the bibliography content
-        escaped_replacement = bibliography_replacement.replace('\\', r'\\')
-        content = re.sub(print_bib_pattern, escaped_replacement, content)
+        # Remove \addbibresource command(s) and replace \printbibliography
+        # with \reftitle and \begin{thebibliography}
+        return self._splice_bibliography(
+            content, _BIB_BIBLATEX_CMDS_RE,
+            f"\\reftitle{{{title}}}\n\\begin{{thebibliography}}{{99}}\n", bibitem_pieces
+        )
+    
+    def _splice_bibliography(self, content: str, pattern: re.Pattern, header: str,
+                             bibitem_pieces: List[str]) -> List[str]:
+        """Split content around each match of pattern and splice in the bibliography
         
-        return content
+        Matches of the pattern's 'drop' group are removed; every other match is
+        replaced. The document is never rebuilt as a whole: the returned pieces
+        reference the unchanged spans of content and the formatted bibitems directly.
+        """
+        pieces = []
+        pos = 0
+        for match in pattern.finditer(content):
+            pieces.append(content[pos:match.start()])
+            pos = match.end()
+            if match.group('drop') is not None:
+                continue
+            pieces.append(header)
+            pieces.extend(bibitem_pieces)
+            pieces.append("\n\\end{thebibliography}")
+        pieces.append(content[pos:])
+        return pieces
     
     def _extract_citation_keys(self, content: str) -> None:
         """Extract all citation keys from the content in order of appearance"""
-        # Clear existing keys but preserve order
-        self.cited_keys = []  # Change to list to preserve order
-        seen_keys = set()     # Track what we've seen to avoid duplicates
+        # Every supported citation command contains 'cite'
+        if 'cite' not in content:
+            self.cited_keys = []
+            return
         
         # Match various citation commands: \cite{}, \citep{}, \citet{}, etc.
-        cite_pattern = r'\\cite[pt]?\*?\s*(?:\[[^\]]*\])?\s*\{([^}]+)\}'
-        
-        for match in re.finditer(cite_pattern, content):
-            keys = match.group(1)
-            # Split by comma and clean up
-            for key in keys.split(','):
-                key = key.strip()
-                if key and key not in seen_keys:
-                    self.cited_keys.append(key)
-                    seen_keys.add(key)
+        # and split comma-separated key lists
+        # (findall returns the single capture group directly)
+        keys = (
+            key.strip()
+            for key_list in _CITE_RE.findall(content)
+            for key in key_list.split(',')
+        )
+        
+        # dict.fromkeys deduplicates while preserving first-appearance order
+        self.cited_keys = list(dict.fromkeys(key for key in keys if key and key != '*'))
     
-    def _parse_bib_file(self) -> Dict[str, Dict[str, str]]:
-        """Parse the .bib file and return entries as dictionaries"""
-        try:
-            with open(self.bib_file, 'r', encoding='utf-8') as f:
-                bib_content = f.read()
-        except UnicodeDecodeError:
-            with open(self.bib_file, 'r', encoding='latin-1') as f:
-                bib_content = f.read()
-        return self._parse_bib_entries(bib_content)
-
-    def _parse_bib_entries(self, bib_content: str) -> Dict[str, Dict[str, str]]:        
-        entries = {}
-        
-        # Pattern to match BibTeX entries
-        entry_pattern = r'@(\w+)\s*\{\s*([^,\s]+)\s*,\s*(.*?)\n\s*\}'
-        
-        for match in re.finditer(entry_pattern, bib_content, re.DOTALL):
-            entry_type = match.group(1).lower()
-            key = match.group(2)
-            fields_str = match.group(3)
-            
-            # Parse fields
-            fields = {'entry_type': entry_type}
-            
-            # Parse fields using a proper brace-counting approach
-            i = 0
-            while i < len(fields_str):
-                # Skip whitespace and commas
-                while i < len(fields_str) and fields_str[i] in ' \t\n,':
-                    i += 1
-                if i >= len(fields_str):
-                    break
-                
-                # Find field name
-                field_start = i
-                while i < len(fields_str) and fields_str[i] not in '=':
-                    i += 1
-                if i >= len(fields_str):
-                    break
-                
-                field_name = fields_str[field_start:i].strip().lower()
-                
-                # Skip '=' and whitespace
-                while i < len(fields_str) and fields_str[i] in '= \t\n':
-                    i += 1
-                if i >= len(fields_str) or fields_str[i] != '{':
-                    continue
-                
-                # Parse field value with proper brace counting
-                i += 1  # Skip opening brace
-                value_start = i
-                brace_count = 1
-                
-                while i < len(fields_str) and brace_count > 0:
-                    if fields_str[i] == '{':
-                        brace_count += 1
-                    elif fields_str[i] == '}':
-                        brace_count -= 1
-                    i += 1
-                
-                if brace_count == 0:
-                    field_value = fields_str[value_start:i-1].strip()
-                    # Clean up field value
-                    field_value = re.sub(r'\s+', ' ', field_value)
-                    fields[field_name] = field_value
-            
-            entries[key] = fields
-        
+    def _parse_bib_file(self, wanted_keys: Optional[frozenset] = None) -> Mapping[str, Mapping[str, str]]:
+        """Parse the .bib file and return entries as read-only mappings
+        
+        When wanted_keys is given, only those entries are parsed. Results are
+        cached per (path, mtime, size, wanted_keys) across processors, so
+        repeated calls for an unchanged file skip reading and parsing. The
+        cached entries are shared, so they are handed out as MappingProxyType
+        views that no caller can modify.
+        """
+        path = os.path.abspath(self.bib_file)
+        stat = os.stat(path)
+        cache_key = (path, stat.st_mtime_ns, stat.st_size, wanted_keys)
+        bib_cache = self._bib_cache
+        
+        # Popping and reinserting keeps the dict in least-recently-used order
+        entries = bib_cache.pop(cache_key, None)
+        if entries is None:
+            bib_content = _read_text(self.bib_file)
+            entries = MappingProxyType({
+                key: MappingProxyType(fields)
+                for key, fields in self._parse_bib_entries(bib_content, _APA_FIELDS, wanted_keys).items()
+            })
+            if len(bib_cache) >= self.BIB_CACHE_SIZE:
+                del bib_cache[next(iter(bib_cache))]
+        bib_cache[cache_key] = entries
         return entries
+
+    def _parse_bib_entries(self, bib_content: str, wanted_fields: Optional[frozenset] = None,
+                           wanted_keys: Optional[frozenset] = None) -> Dict[str, Dict[str, str]]:
+        """Parse BibTeX entries, optionally keeping only wanted_fields of wanted_keys"""
+        return _parse_bib_text(bib_content, wanted_fields, wanted_keys)
     
-    def _create_bibitem_content(self, bib_entries: Dict[str, Dict[str, str]]) -> str:
+    def _create_bibitem_content(self, bib_entries: Mapping[str, Mapping[str, str]]) -> str:
         """Convert filtered bibliography entries to \bibitem format in APA style"""
+        return ''.join(self._bibitem_pieces(bib_entries))
+    
+    def _bibitem_pieces(self, bib_entries: Mapping[str, Mapping[str, str]]) -> List[str]:
+        """Format cited entries as \bibitem strings interleaved with blank-line separators"""
         bibitem_lines = []
         
+        # Bind hot lookups to locals once instead of on every iteration
+        append = bibitem_lines.append
+        format_bibitem = self._format_apa_bibitem
+        get_entry = bib_entries.get
+        bibitem_cache = self._bibitem_cache
+        
         # for key in sorted(self.cited_keys):
         for key in self.cited_keys:
-            if key in bib_entries:
-                entry = bib_entries[key]
-                bibitem_line = self._format_apa_bibitem(key, entry)
-                bibitem_lines.append(bibitem_line)
+            entry = get_entry(key)
+            if entry is not None:
+                # Entries of an unchanged .bib file come from _bib_cache as the
+                # same objects, so an identity check means nothing changed;
+                # popping and reinserting keeps least-recently-used order
+                cached = bibitem_cache.pop(key, None)
+                if cached is not None and cached[0] is entry:
+                    bibitem = cached[1]
+                else:
+                    bibitem = format_bibitem(key, entry)
+                    if len(bibitem_cache) >= self.BIBITEM_CACHE_SIZE:
+                        del bibitem_cache[next(iter(bibitem_cache))]
+                bibitem_cache[key] = (entry, bibitem)
+                append(bibitem)
             else:
                 print(f"Warning: Citation key '{key}' not found in bibliography")
-                bibitem_lines.append(f"\\bibitem{{{key}}} % Citation not found: {key}")
+                append(f"\\bibitem{{{key}}} % Citation not found: {key}")
+            append('\n\n')
         
-        return '\n\n'.join(bibitem_lines)
+        # Drop the trailing separator
+        return bibitem_lines[:-1]
 
     def _format_authors_short(self, author, year): 
         """Format author names in short format with year.
@@ -941,20 +1237,37 @@ class LaTeXProcessor:
         if not author:
             return ""
         
-        # Split authors by ' and '
-        authors = [a.strip() for a in author.split(' and ')]
+        return self._short_author_label(self._parse_authors(author), year)
+
+    def _parse_authors(self, author_str: str) -> List[Tuple[str, List[str]]]:
+        """Split an author list once into (last name, initials) pairs
+        
+        Handles both "Last, First Middle" and "First Middle Last" formats.
+        """
+        # Parsed field values are whitespace-collapsed, so a plain str.split
+        # gives the same result as the regex when only single spaces occur
+        # (isprintable() is False for every other whitespace character)
+        if author_str.isprintable() and '  ' not in author_str:
+            authors = author_str.split(' and ')
+        else:
+            authors = _AND_SPLIT_RE.split(author_str)
         
-        # Extract last names from author names
-        last_names = []
-        for auth in authors:
-            # Handle "Lastname, Firstname" format
-            if ',' in auth:
-                last_name = auth.split(',')[0].strip()
+        parsed = []
+        for author in authors:
+            if ',' in author:
+                last_name, first_names = author.split(',', 1)
+                last_name = last_name.strip()
+                names = first_names.split()
             else:
-                # Handle "Firstname Lastname" format
-                parts = auth.split()
-                last_name = parts[-1] if parts else ""
-            last_names.append(last_name)
+                names = author.split()
+                last_name = names.pop() if names else ""
+            initials = [f"{name[:1].upper()}." for name in names if name[:1].isalpha()]
+            parsed.append((last_name, initials))
+        return parsed
+
+    def _short_author_label(self, parsed_authors: List[Tuple[str, List[str]]], year) -> str:
+        """Format parsed authors as the short citation label with year"""
+        last_names = [last_name for last_name, _ in parsed_authors]
         
         # Format based on number of authors
         if len(last_names) == 1:
@@ -967,7 +1280,7 @@ class LaTeXProcessor:
         return short_author
 
 
-    def _format_apa_bibitem(self, key: str, entry: Dict[str, str]) -> str:
+    def _format_apa_bibitem(self, key: str, entry: Mapping[str, str]) -> str:
         """Format a single bibliography entry in APA style"""
         entry_type = entry.get('entry_type', '')
         
@@ -978,123 +1291,47 @@ class LaTeXProcessor:
         doi = entry.get('doi', '')
 
         # Clean up author names - convert "Last, First and Last2, First2" to "Last, F. & Last2, F."
+        # Authors are parsed once and formatted both ways
         if author:
-            short_author = self._format_authors_short(author, year)
-            author = self._format_authors_apa(author)
+            parsed_authors = self._parse_authors(author)
+            short_author = self._short_author_label(parsed_authors, year)
+            author = self._apa_author_list(parsed_authors)
         
         # Clean up title - remove extra braces
-        if title:
-            title = re.sub(r'\{([^{}]*)\}', r'\1', title)
+        if '{' in title:
+            title = _strip_inner_braces(title)
     
         # Start building the \bibitem entry, generics first
+        parts: List[str] = []
         if author:
-            result = f"\\bibitem[{short_author}]{{{key}}} {author} "
+            parts.append(f"\\bibitem[{short_author}]{{{key}}} {author} ")
         else:
-            result = f"\\bibitem{{{key}}}"
+            parts.append(f"\\bibitem{{{key}}}")
         if year:
-            result += f"({year}). "
+            parts.append(f"({year}). ")
 
-        if entry_type == 'article':
-            journal = entry.get('journal', '')
-            volume = entry.get('volume', '')
-            number = entry.get('number', '')
-            pages = entry.get('pages', '')
-            
-            # Format: Author (Year). Title. Journal, Volume(Number), pages.
-            if title:
-                result += f"{title}. "
-            if journal:
-                result += f" \\textit{{{journal}}}"
-                if volume:
-                    result += f", {volume}"
-                    if number:
-                        result += f"({number})"
-                if pages:
-                    result += f", {pages}"
-                result += "."
-
-        elif entry_type == 'book':
-            publisher = entry.get('publisher', '')
-            address = entry.get('address', '')
-            
-            # Format: Author (Year). Title. Publisher.
-            if title:
-                result += f"\\textit{{{title}}}. "            
-            if publisher:
-                result += f" {publisher}"
-                if address:
-                    result += f": {address}"
-                result += "."
-                
-        elif entry_type == 'inproceedings' or entry_type == 'conference' or entry_type == 'incollection':
-            booktitle = entry.get('booktitle', '')
-            pages = entry.get('pages', '')
-            
-            if title:
-                result += f"{title}. "            
-            if booktitle:
-                result += f"In \\textit{{{booktitle}}}"
-                if pages:
-                    result += f" (pp. {pages})"
-                result += "."
-                
-        elif entry_type == 'techreport':
-            # Format: Author (Year). Title. Institution.
-            if title:
-                result += f"{title}."
-            result += " Technical Report"
-            institution = entry.get('institution', '')
-            if institution:
-                result += f", {institution}"
-            result += "."
+        # Append the type-specific part (unknown types only get the generics)
+        format_entry_type = _APA_FORMATTERS.get(entry_type)
+        if format_entry_type is not None:
+            format_entry_type(parts, entry, title)
 
         if doi:
             # Clean up DOI - unescape underscores that might be escaped in BibTeX
-            doi_cleaned = doi.replace(r'{\_}', '_').replace(r'{\\_}', '_')
-            result += f" \\url{{https://doi.org/{doi_cleaned}}}."   
+            doi_cleaned = _DOI_ESCAPE_RE.sub('_', doi) if '{' in doi else doi
+            parts.append(f" \\url{{https://doi.org/{doi_cleaned}}}.")
 
-        return result
+        return ''.join(parts)
     
     def _format_authors_apa(self, author_str: str) -> str:
         """Format author names in APA style"""
-        # Split by 'and'
-        authors = re.split(r'\s+and\s+', author_str)
-        formatted_authors = []
-        
-        for author in authors:
-            author = author.strip()
-            if ',' in author:
-                # Format: "Last, First Middle" -> "Last, F. M."
-                parts = author.split(',', 1)
-                last_name = parts[0].strip()
-                first_names = parts[1].strip() if len(parts) > 1 else ''
-                
-                if first_names:
-                    # Extract initials
-                    initials = []
-                    for name in first_names.split():
-                        if name and name[0].isalpha():
-                            initials.append(f"{name[0].upper()}.")
-                    
-                    if initials:
-                        formatted_authors.append(f"{last_name}, {' '.join(initials)}")
-                    else:
-                        formatted_authors.append(last_name)
-                else:
-                    formatted_authors.append(last_name)
-            else:
-                # Assume "First Last" format
-                names = author.split()
-                if len(names) >= 2:
-                    last_name = names[-1]
-                    first_names = names[:-1]
-                    initials = [f"{name[0].upper()}." for name in first_names if name and name[0].isalpha()]
-                    if initials:
-                        formatted_authors.append(f"{last_name}, {' '.join(initials)}")
-                    else:
-                        formatted_authors.append(last_name)
-                else:
-                    formatted_authors.append(author)
+        return self._apa_author_list(self._parse_authors(author_str))
+
+    def _apa_author_list(self, parsed_authors: List[Tuple[str, List[str]]]) -> str:
+        """Format parsed authors in APA style: "Last, F. M., Last2, F., \\& Last3, F." """
+        formatted_authors = [
+            f"{last_name}, {' '.join(initials)}" if initials else last_name
+            for last_name, initials in parsed_authors
+        ]
         
         # Join with & for APA style
         if len(formatted_authors) == 1:
@@ -1102,7 +1339,7 @@ class LaTeXProcessor:
         elif len(formatted_authors) == 2:
             return f"{formatted_authors[0]} \\& {formatted_authors[1]}"
         else:
-            return ', '.join(formatted_authors[:-1]) + f", \\& {formatted_authors[-1]}"
+            return f"{', '.join(formatted_authors[:-1])}, \\& {formatted_authors[-1]}"
 
 
 def main():
@@ -9,39 +9,35 @@ SPDX-License-Identifier: Apache-2.0
 
 import json
 import sys
+import time
 import unittest
 from datetime import datetime, timedelta
 from pathlib import Path
 from unittest.mock import patch
 import tempfile
-import shutil
 
 # Add parent scripts directory to path to import doi_validator
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from doi_validator import DOICache, DOIValidator
+from doi_validator import DOICache, DOIStatus, DOIValidator
 
 
 class TestDOICache(unittest.TestCase):
     """Test suite for DOICache class"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Create one temporary directory for all cache tests, removed after the class"""
+        cls.test_dir = cls.enterClassContext(tempfile.TemporaryDirectory())
+    
     def setUp(self):
         """Set up test fixtures"""
-        # Create a temporary directory for test cache
-        self.test_dir = tempfile.mkdtemp()
-        self.test_cache_file = Path(self.test_dir) / '.bib_validator_test'
-        
-        # Patch the cache file location
-        self.cache_patcher = patch.object(DOICache, 'CACHE_FILE', self.test_cache_file)
-        self.cache_patcher.start()
-    
-    def tearDown(self):
-        """Clean up test fixtures"""
-        self.cache_patcher.stop()
-        # Explicitly remove test cache file if it exists
-        if self.test_cache_file.exists():
-            self.test_cache_file.unlink()
-        shutil.rmtree(self.test_dir)
+        # Each test gets its own cache file in the shared directory
+        self.test_cache_file = Path(self.test_dir) / f'.bib_validator_{self._testMethodName}'
+        
+        # Point the cache at the test file; a plain class attribute swap
+        self.addCleanup(setattr, DOICache, 'CACHE_FILE', DOICache.CACHE_FILE)
+        DOICache.CACHE_FILE = self.test_cache_file
     
     def test_cache_initialization_empty(self):
         """Test cache initializes with empty dict when no file exists"""
@@ -49,6 +45,16 @@ class TestDOICache(unittest.TestCase):
         self.assertEqual(cache.cache, {})
         self.assertFalse(self.test_cache_file.exists())
     
+    def test_cache_loads_file_on_first_access(self):
+        """Test the cache file is read lazily, and only once"""
+        with patch.object(DOICache, '_load_cache', return_value={}) as load_cache:
+            cache = DOICache()
+            load_cache.assert_not_called()
+            
+            cache.get("10.1234/test.doi")
+            cache.get_status("10.1234/test.doi")
+            load_cache.assert_called_once()
+    
     def test_cache_set_and_get(self):
         """Test setting and getting a cached DOI result"""
         cache = DOICache()
@@ -129,10 +135,9 @@ class TestDOICache(unittest.TestCase):
         doi = "10.1234/expired.doi"
         
         # Set cache entry with old timestamp
-        old_timestamp = (datetime.now() - timedelta(days=31)).isoformat()
         cache.cache[doi] = {
             'is_valid': True,
-            'timestamp': old_timestamp
+            'ts': time.time() - 31 * 86400
         }
         cache._save_cache()
         
@@ -146,10 +151,9 @@ class TestDOICache(unittest.TestCase):
         doi = "10.1234/almost_expired.doi"
         
         # Set cache entry with timestamp 29 days ago
-        old_timestamp = (datetime.now() - timedelta(days=29)).isoformat()
         cache.cache[doi] = {
             'is_valid': True,
-            'timestamp': old_timestamp
+            'ts': time.time() - 29 * 86400
         }
         cache._save_cache()
         
@@ -184,41 +188,18 @@ class TestDOICache(unittest.TestCase):
         self.assertFalse(self.test_cache_file.exists())
         self.assertEqual(cache.cache, {})
     
-    def test_cache_store_validated_status(self):
-        """Test caching DOI with Validated status"""
-        cache = DOICache()
-        doi = "10.1111/validated.doi"
-        
-        cache.set_status(doi, "Validated")
-        status = cache.get_status(doi)
-        
-        self.assertEqual(status, "Validated")
-        self.assertTrue(cache.is_doi_valid(doi))
-        self.assertTrue(cache.is_valid(doi))
-    
-    def test_cache_store_exists_status(self):
-        """Test caching DOI with Exists status"""
+    def test_cache_store_statuses(self):
+        """Test caching DOIs with Validated, Exists and NonExists status"""
         cache = DOICache()
-        doi = "10.1111/exists.doi"
-        
-        cache.set_status(doi, "Exists")
-        status = cache.get_status(doi)
-        
-        self.assertEqual(status, "Exists")
-        self.assertTrue(cache.is_doi_valid(doi))
-        self.assertTrue(cache.is_valid(doi))
-    
-    def test_cache_store_nonexists_status(self):
-        """Test caching DOI with NonExists status"""
-        cache = DOICache()
-        doi = "10.1111/nonexists.doi"
-        
-        cache.set_status(doi, "NonExists")
-        status = cache.get_status(doi)
-        
-        self.assertEqual(status, "NonExists")
-        self.assertFalse(cache.is_doi_valid(doi))
-        self.assertTrue(cache.is_valid(doi))
+        for status, doi_valid in (("Validated", True), ("Exists", True), ("NonExists", False)):
+            with self.subTest(status=status):
+                doi = f"10.1111/{status.lower()}.doi"
+                
+                cache.set_status(doi, status)
+                
+                self.assertEqual(cache.get_status(doi), status)
+                self.assertEqual(cache.is_doi_valid(doi), doi_valid)
+                self.assertTrue(cache.is_valid(doi))
     
     def test_cache_multiple_entries(self):
         """Test cache with multiple entries"""
@@ -239,18 +220,130 @@ class TestDOICache(unittest.TestCase):
             self.assertEqual(result, expected_valid)
             self.assertTrue(cache.is_valid(doi))
     
+    def test_cache_batched_writes(self):
+        """Test that updates inside a with-block are saved once on exit"""
+        cache = DOICache()
+        dois = ["10.1234/first.doi", "10.5678/second.doi", "10.9012/third.doi"]
+        
+        with patch.object(cache, '_append_pending', wraps=cache._append_pending) as append_pending:
+            with cache:
+                for doi in dois:
+                    cache.set_status(doi, "Exists")
+                self.assertFalse(self.test_cache_file.exists())
+        
+        append_pending.assert_called_once()
+        reloaded = DOICache()
+        for doi in dois:
+            self.assertEqual(reloaded.get_status(doi), "Exists")
+    
+    def test_cache_skips_recent_identical_result(self):
+        """Test that re-storing a fresh identical result does not write the file"""
+        cache = DOICache()
+        doi = "10.1234/repeat.doi"
+        cache.set_status(doi, "Exists")
+        
+        with patch.object(cache, 'flush') as flush:
+            cache.set_status(doi, "Exists")
+            flush.assert_not_called()
+            
+            # A different result is always stored
+            cache.set_status(doi, "NonExists")
+            flush.assert_called_once()
+        self.assertEqual(cache.get_status(doi), "NonExists")
+    
+    def test_cache_refreshes_old_identical_result(self):
+        """Test that an identical result older than the refresh interval is rewritten"""
+        cache = DOICache()
+        doi = "10.1234/old.doi"
+        cache.cache[doi] = {'is_valid': True, 'ts': time.time() - 2 * DOICache.REFRESH_SECONDS}
+        
+        cache.set(doi, True)
+        
+        self.assertGreater(cache.cache[doi]['ts'], time.time() - 60)
+        self.assertIn(doi, DOICache().cache)
+    
+    def test_cache_flush_without_changes(self):
+        """Test that flushing an unchanged cache does not write the file"""
+        cache = DOICache()
+        cache.flush()
+        with cache:
+            pass
+        
+        self.assertFalse(self.test_cache_file.exists())
+    
     def test_cache_file_format(self):
-        """Test that cache file is valid JSON"""
+        """Test that cache file holds one JSON object per line"""
         cache = DOICache()
         cache.set("10.1234/test.doi", True)
+        cache.set("10.1234/other.doi", False)
         
         # Read cache file directly
+        data = {}
         with open(self.test_cache_file, 'r') as f:
-            data = json.load(f)
+            for line in f:
+                data.update(json.loads(line))
         
         self.assertIn("10.1234/test.doi", data)
         self.assertIn("is_valid", data["10.1234/test.doi"])
-        self.assertIn("timestamp", data["10.1234/test.doi"])
+        self.assertIsInstance(data["10.1234/test.doi"]["ts"], float)
+        self.assertIn("10.1234/other.doi", data)
+    
+    def test_cache_log_appends_and_compacts(self):
+        """Test that updates are appended and the log is compacted when it grows"""
+        cache = DOICache()
+        cache.set("10.1234/first.doi", True)
+        cache.set("10.1234/second.doi", True)
+        self.assertEqual(len(self.test_cache_file.read_text().splitlines()), 2)
+        
+        # Rewriting the same entries pushes the log past twice the live entries
+        cache.set("10.1234/first.doi", False)
+        cache.set("10.1234/second.doi", False)
+        cache.set("10.1234/first.doi", True)
+        self.assertEqual(len(self.test_cache_file.read_text().splitlines()), 1)
+        
+        reloaded = DOICache()
+        self.assertTrue(reloaded.get("10.1234/first.doi"))
+        self.assertFalse(reloaded.get("10.1234/second.doi"))
+    
+    def test_cache_save_replaces_file(self):
+        """Test that a full save leaves only the cache file, as one JSON line"""
+        cache = DOICache()
+        cache.cache["10.1234/test.doi"] = {'is_valid': True, 'ts': time.time()}
+        cache._save_cache()
+        
+        lines = self.test_cache_file.read_text().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn("10.1234/test.doi", json.loads(lines[0]))
+        self.assertFalse(self.test_cache_file.with_name(self.test_cache_file.name + '.tmp').exists())
+    
+    def test_cache_load_legacy_file(self):
+        """Test loading an indented whole-file JSON cache with ISO timestamps"""
+        legacy = {
+            "10.1234/legacy.doi": {
+                "is_valid": True,
+                "status": "Exists",
+                "timestamp": (datetime.now() - timedelta(days=1)).isoformat()
+            },
+            "10.1234/expired.doi": {
+                "is_valid": True,
+                "status": "Exists",
+                "timestamp": (datetime.now() - timedelta(days=31)).isoformat()
+            }
+        }
+        with open(self.test_cache_file, 'w') as f:
+            json.dump(legacy, f, indent=2)
+        
+        cache = DOICache()
+        self.assertEqual(cache.get_status("10.1234/legacy.doi"), "Exists")
+        self.assertTrue(cache.is_valid("10.1234/legacy.doi"))
+        self.assertFalse(cache.is_valid("10.1234/expired.doi"))
+        
+        # Appending to a legacy file keeps both entries readable
+        cache.set_status("10.1234/new.doi", "Validated")
+        reloaded = DOICache()
+        self.assertEqual(reloaded.get_status("10.1234/legacy.doi"), "Exists")
+        self.assertEqual(reloaded.get_status("10.1234/new.doi"), "Validated")
+        self.assertNotIn("timestamp", reloaded.cache["10.1234/legacy.doi"])
     
     def test_cache_load_invalid_json(self):
         """Test cache handles invalid JSON gracefully"""
@@ -262,6 +355,18 @@ class TestDOICache(unittest.TestCase):
         cache = DOICache()
         self.assertEqual(cache.cache, {})
     
+    def test_cache_clear_after_invalid_json(self):
+        """Test that clearing drops the pending rewrite of a malformed log"""
+        with open(self.test_cache_file, 'w') as f:
+            f.write("invalid json {")
+        
+        cache = DOICache()
+        self.assertEqual(cache.cache, {})
+        self.assertTrue(cache._compact_on_flush)
+        
+        cache.clear()
+        self.assertFalse(cache._compact_on_flush)
+    
     def test_cache_verbose_mode(self):
         """Test cache in verbose mode"""
         cache = DOICache(verbose=True)
@@ -275,6 +380,15 @@ class TestDOICache(unittest.TestCase):
 class TestBibTeXParsing(unittest.TestCase):
     """Test suite for BibTeX parsing functionality"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Create one validator shared by all parsing tests"""
+        cls.validator = DOIValidator.__new__(DOIValidator)
+    
+    def setUp(self):
+        """Start each test with no parsed entries"""
+        self.validator.entries = {}
+    
     def test_parse_simple_entry_with_doi(self):
         """Test parsing a simple article entry with DOI"""
         bib_content = """@article{Hodkinson2005,
@@ -288,18 +402,16 @@ class TestBibTeXParsing(unittest.TestCase):
     doi = {10.1080/13676260500149238},
     issn = {13676261}
 }"""
-        validator = DOIValidator.__new__(DOIValidator)
-        validator.entries = {}
-        validator._parse_bib_entries(bib_content)
+        self.validator._parse_bib_entries(bib_content)
         
         # Verify entry was parsed
-        self.assertIn('Hodkinson2005', validator.entries)
+        self.assertIn('Hodkinson2005', self.validator.entries)
         self.assertEqual(
-            validator.entries['Hodkinson2005']['doi'],
+            self.validator.entries['Hodkinson2005']['doi'],
             '10.1080/13676260500149238'
         )
         self.assertEqual(
-            validator.entries['Hodkinson2005']['entry_type'],
+            self.validator.entries['Hodkinson2005']['entry_type'],
             'article'
         )
     
@@ -309,12 +421,10 @@ class TestBibTeXParsing(unittest.TestCase):
     title = {{50 gouden regels en tips voor een proefschriftonderzoek}},
     author = {Arno, Prof A and Korsten, F A and Albert, A}
 }"""
-        validator = DOIValidator.__new__(DOIValidator)
-        validator.entries = {}
-        validator._parse_bib_entries(bib_content)
+        self.validator._parse_bib_entries(bib_content)
         
         # Entry without DOI should not be in entries
-        self.assertNotIn('Arno', validator.entries)
+        self.assertNotIn('Arno', self.validator.entries)
     
     def test_parse_multiple_entries(self):
         """Test parsing multiple entries with and without DOIs"""
@@ -343,15 +453,13 @@ class TestBibTeXParsing(unittest.TestCase):
     author = {van Oorschot, J. and Hofman, E. and Halman, J.},
     doi = {10.5465/ambpp.2015.16847abstract}
 }"""
-        validator = DOIValidator.__new__(DOIValidator)
-        validator.entries = {}
-        validator._parse_bib_entries(bib_content)
+        self.validator._parse_bib_entries(bib_content)
         
         # Should parse 2 entries with DOI
-        self.assertEqual(len(validator.entries), 2)
-        self.assertIn('Wirth2008', validator.entries)
-        self.assertIn('VanOorschot2015', validator.entries)
-        self.assertNotIn('Simon1955', validator.entries)
+        self.assertEqual(len(self.validator.entries), 2)
+        self.assertIn('Wirth2008', self.validator.entries)
+        self.assertIn('VanOorschot2015', self.validator.entries)
+        self.assertNotIn('Simon1955', self.validator.entries)
     
     def test_doi_cleanup_with_special_characters(self):
         """Test that DOI cleanup handles escaped underscores"""
@@ -360,13 +468,11 @@ class TestBibTeXParsing(unittest.TestCase):
     author = {Author},
     doi = {10.1057/978-1-349-94848-2{\\_}390-1}
 }"""
-        validator = DOIValidator.__new__(DOIValidator)
-        validator.entries = {}
-        validator._parse_bib_entries(bib_content)
+        self.validator._parse_bib_entries(bib_content)
         
         # Verify escaped underscore is cleaned
         self.assertEqual(
-            validator.entries['TestBook']['doi'],
+            self.validator.entries['TestBook']['doi'],
             '10.1057/978-1-349-94848-2_390-1'
         )
     
@@ -377,13 +483,11 @@ class TestBibTeXParsing(unittest.TestCase):
     author = {Author},
     doi = {10.1234/{_}test}
 }"""
-        validator = DOIValidator.__new__(DOIValidator)
-        validator.entries = {}
-        validator._parse_bib_entries(bib_content)
+        self.validator._parse_bib_entries(bib_content)
         
         # Verify {_} is cleaned
         self.assertEqual(
-            validator.entries['TestBook2']['doi'],
+            self.validator.entries['TestBook2']['doi'],
             '10.1234/_test'
         )
     
@@ -394,13 +498,11 @@ class TestBibTeXParsing(unittest.TestCase):
     author = {Author},
     doi = {10.1234/test{code}123}
 }"""
-        validator = DOIValidator.__new__(DOIValidator)
-        validator.entries = {}
-        validator._parse_bib_entries(bib_content)
+        self.validator._parse_bib_entries(bib_content)
         
         # Verify braces are removed
         self.assertEqual(
-            validator.entries['TestBook3']['doi'],
+            self.validator.entries['TestBook3']['doi'],
             '10.1234/testcode123'
         )
     
@@ -413,18 +515,16 @@ class TestBibTeXParsing(unittest.TestCase):
     author = {Venable, John Robert},
     doi = {10.1007/978-3-642-29863-9}
 }"""
-        validator = DOIValidator.__new__(DOIValidator)
-        validator.entries = {}
-        validator._parse_bib_entries(bib_content)
+        self.validator._parse_bib_entries(bib_content)
         
         # Verify inproceedings entry is parsed
-        self.assertIn('Venable2012', validator.entries)
+        self.assertIn('Venable2012', self.validator.entries)
         self.assertEqual(
-            validator.entries['Venable2012']['entry_type'],
+            self.validator.entries['Venable2012']['entry_type'],
             'inproceedings'
         )
         self.assertEqual(
-            validator.entries['Venable2012']['doi'],
+            self.validator.entries['Venable2012']['doi'],
             '10.1007/978-3-642-29863-9'
         )
     
@@ -437,14 +537,12 @@ class TestBibTeXParsing(unittest.TestCase):
     school = {Edinburgh},
     doi = {10.1234/phd.thesis}
 }"""
-        validator = DOIValidator.__new__(DOIValidator)
-        validator.entries = {}
-        validator._parse_bib_entries(bib_content)
+        self.validator._parse_bib_entries(bib_content)
         
         # Verify phdthesis entry is parsed
-        self.assertIn('Valdez1989', validator.entries)
+        self.assertIn('Valdez1989', self.validator.entries)
         self.assertEqual(
-            validator.entries['Valdez1989']['entry_type'],
+            self.validator.entries['Valdez1989']['entry_type'],
             'phdthesis'
         )
     
@@ -455,14 +553,12 @@ class TestBibTeXParsing(unittest.TestCase):
     author = {Author},
     DOI = {10.1234/test.case}
 }"""
-        validator = DOIValidator.__new__(DOIValidator)
-        validator.entries = {}
-        validator._parse_bib_entries(bib_content)
+        self.validator._parse_bib_entries(bib_content)
         
         # Should find DOI even if in uppercase
-        self.assertIn('TestDOI', validator.entries)
+        self.assertIn('TestDOI', self.validator.entries)
         self.assertEqual(
-            validator.entries['TestDOI']['doi'],
+            self.validator.entries['TestDOI']['doi'],
             '10.1234/test.case'
         )
     
@@ -473,15 +569,72 @@ class TestBibTeXParsing(unittest.TestCase):
     author = {Author},
     doi = {10.1093/oxfordhb/9780199763986.013.0003}
 }"""
-        validator = DOIValidator.__new__(DOIValidator)
-        validator.entries = {}
-        validator._parse_bib_entries(bib_content)
+        self.validator._parse_bib_entries(bib_content)
         
         # Verify complex DOI is preserved
         self.assertEqual(
-            validator.entries['Complex2023']['doi'],
+            self.validator.entries['Complex2023']['doi'],
             '10.1093/oxfordhb/9780199763986.013.0003'
         )
+    
+    def test_parse_entry_closing_on_last_field_line(self):
+        """Test entries whose closing brace follows the last field are kept separate"""
+        bib_content = """@article{Inline2020,
+    title = {Inline},
+    doi = {10.1234/inline}}
+@comment{not an entry, doi = {10.1234/comment}}
+@article{Next2021,
+    title = {Next},
+    doi = {10.1234/next}
+}"""
+        self.validator._parse_bib_entries(bib_content)
+        
+        self.assertEqual(self.validator.entries['Inline2020']['doi'], '10.1234/inline')
+        self.assertEqual(self.validator.entries['Next2021']['doi'], '10.1234/next')
+        self.assertEqual(len(self.validator.entries), 2)
+
+
+
+class TestDOIValidation(unittest.TestCase):
+    """Test suite for the validation loop"""
+    
+    def setUp(self):
+        """Point the cache at a temporary file"""
+        test_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.addCleanup(setattr, DOICache, 'CACHE_FILE', DOICache.CACHE_FILE)
+        DOICache.CACHE_FILE = Path(test_dir) / '.bib_validator'
+    
+    def test_duplicate_dois_checked_once(self):
+        """Test that a DOI shared by several entries is only checked once per run"""
+        validator = DOIValidator('unused.bib')
+        validator.entries = {
+            'First2020': {'doi': '10.1234/shared', 'entry_type': 'article'},
+            'Second2021': {'doi': '10.1234/shared', 'entry_type': 'article'},
+        }
+        
+        with patch.object(validator, '_check_doi', return_value=DOIStatus.Confirmed) as check_doi, \
+                patch('doi_validator.time.sleep'), patch('builtins.print'):
+            validator._validate_dois()
+        
+        check_doi.assert_called_once_with('10.1234/shared', 'First2020')
+        self.assertEqual(validator.doi_results['Second2021'], ('10.1234/shared', DOIStatus.Confirmed))
+    
+    def test_duplicate_doi_retried_after_error(self):
+        """Test that a transient error is not reused for a duplicate DOI"""
+        validator = DOIValidator('unused.bib')
+        validator.entries = {
+            'First2020': {'doi': '10.1234/shared', 'entry_type': 'article'},
+            'Second2021': {'doi': '10.1234/shared', 'entry_type': 'article'},
+        }
+        
+        with patch.object(validator, '_check_doi', side_effect=[DOIStatus.Internal_Error, DOIStatus.Confirmed]) as check_doi, \
+                patch('doi_validator.time.sleep'), patch('builtins.print'):
+            validator._validate_dois()
+        
+        self.assertEqual(check_doi.call_count, 2)
+        self.assertEqual(validator.doi_results['First2020'], ('10.1234/shared', DOIStatus.Internal_Error))
+        self.assertEqual(validator.doi_results['Second2021'], ('10.1234/shared', DOIStatus.Confirmed))
+
 
 
 if __name__ == '__main__':
@@ -12,38 +12,36 @@ SPDX-License-Identifier: Apache-2.0
 import unittest
 import tempfile
 from pathlib import Path
-import shutil
 import sys
+from unittest.mock import patch
 
 # Add parent scripts directory to path to import latex_processor
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-try:
-    from latex_processor import LaTeXProcessor
-except ImportError:
-    print("Error: Could not import latex_processor module.")
-    print("Make sure latex_processor.py is in the scripts directory.")
-    sys.exit(1)
+from latex_processor import LaTeXProcessor, _read_text
 
 
-class TestLaTeXProcessor(unittest.TestCase):
+class _TempDirMixin:
+    """Give each test its own directory below one temporary directory per class"""
     
-    def setUp(self):
-        """Set up test environment with temporary directory"""
-        self.test_dir = Path(tempfile.mkdtemp())
-        self.processor = None
+    @classmethod
+    def setUpClass(cls):
+        """Create one temporary directory for the class, removed after its tests"""
+        cls.root_dir = Path(cls.enterClassContext(tempfile.TemporaryDirectory()))
     
-    def tearDown(self):
-        """Clean up test environment"""
-        if self.test_dir.exists():
-            shutil.rmtree(self.test_dir)
+    def setUp(self):
+        """Set up test environment with its own subdirectory"""
+        self.test_dir = self.root_dir / self._testMethodName
+        self.test_dir.mkdir()
     
     def create_test_file(self, filename: str, content: str) -> Path:
         """Helper to create test files"""
         file_path = self.test_dir / filename
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        file_path.write_text(content, encoding='utf-8')
         return file_path
+
+
+class TestLaTeXProcessor(_TempDirMixin, unittest.TestCase):
     
     def test_simple_include_processing(self):
         r"""Test basic \input and \include processing"""
@@ -126,6 +124,20 @@ Also \citet{Brown2021} and multiple \cite{Davis2018,Wilson2022}.
         
         expected_keys = ['Smith2020', 'Jones2019', 'Brown2021', 'Davis2018', 'Wilson2022']
         self.assertEqual(processor.cited_keys, expected_keys)
+
+    def test_citation_extraction_extended_commands(self):
+        r"""Test extraction of keys from natbib and BibLaTeX citation variants"""
+        content = r"""
+\citeauthor{Smith2020} argued \citeyear{Smith2020}; see \citealp{Jones2019}.
+\parencite[see][p.~4]{Brown2021} and \textcite{Davis2018}, \autocite*{Lee2017}.
+\nocite{Wilson2022,*}
+"""
+
+        processor = LaTeXProcessor("dummy.tex")
+        processor._extract_citation_keys(content)
+
+        expected_keys = ['Smith2020', 'Jones2019', 'Brown2021', 'Davis2018', 'Lee2017', 'Wilson2022']
+        self.assertEqual(processor.cited_keys, expected_keys)
     
     def test_bibtex_parsing(self):
         """Test parsing of BibTeX entries"""
@@ -162,6 +174,145 @@ Also \citet{Brown2021} and multiple \cite{Davis2018,Wilson2022}.
         self.assertEqual(smith_entry["author"], "Smith, John and Doe, Jane")
         self.assertEqual(smith_entry["year"], "2020")
     
+    def test_bibtex_parsing_cached(self):
+        """Test that an unchanged .bib file is parsed only once"""
+        bib_content = r"""
+@book{Jones2019,
+  title={The Complete Guide},
+  author={Jones, Bob},
+  year={2019}
+}
+"""
+        
+        bib_file = self.create_test_file("refs.bib", bib_content)
+        
+        processor = LaTeXProcessor("dummy.tex")
+        processor.bib_file = bib_file
+        first = processor._parse_bib_file()
+        self.assertIs(processor._parse_bib_file(), first)
+        
+        # Changing the file invalidates the cached entries
+        self.create_test_file("refs.bib", bib_content + "\n@misc{Extra2020, title={Extra}}\n")
+        self.assertIn("Extra2020", processor._parse_bib_file())
+    
+    def test_bibtex_parse_shared_between_processors(self):
+        """Test that a new processor reuses the parse of an unchanged .bib file"""
+        bib_file = self.create_test_file("refs.bib", "@book{Jones2019,\n  title={Guide},\n  year={2019}\n}\n")
+        
+        first = LaTeXProcessor("dummy.tex")
+        first.bib_file = bib_file
+        entries = first._parse_bib_file()
+        
+        second = LaTeXProcessor("dummy.tex")
+        second.bib_file = bib_file
+        with patch('latex_processor._read_text') as read_text:
+            self.assertIs(second._parse_bib_file(), entries)
+        read_text.assert_not_called()
+    
+    def test_shared_bibtex_parse_is_read_only(self):
+        """Test that entries from the shared parse cache cannot be modified"""
+        bib_file = self.create_test_file("refs.bib", "@book{Jones2019,\n  title={Guide},\n  year={2019}\n}\n")
+        
+        processor = LaTeXProcessor("dummy.tex")
+        processor.bib_file = bib_file
+        entries = processor._parse_bib_file(frozenset({'Jones2019'}))
+        with self.assertRaises(TypeError):
+            entries['Jones2019']['title'] = 'MUTATED'
+        with self.assertRaises(TypeError):
+            entries['Other2020'] = {}
+        
+        second = LaTeXProcessor("dummy.tex")
+        second.bib_file = bib_file
+        self.assertEqual(second._parse_bib_file(frozenset({'Jones2019'}))['Jones2019']['title'], 'Guide')
+    
+    def test_bibitems_cached_for_unchanged_entries(self):
+        """Test that reprocessing an unchanged .bib file reuses formatted bibitems"""
+        bib_file = self.create_test_file("refs.bib", "@book{Jones2019,\n  title={Guide},\n  author={Jones, Bob},\n  year={2019}\n}\n")
+        
+        processor = LaTeXProcessor("dummy.tex")
+        processor.bib_file = bib_file
+        processor.cited_keys = ['Jones2019']
+        first = processor._create_bibitem_content(processor._parse_bib_file())
+        with patch.object(processor, '_format_apa_bibitem') as format_bibitem:
+            second = processor._create_bibitem_content(processor._parse_bib_file())
+        
+        format_bibitem.assert_not_called()
+        self.assertEqual(second, first)
+        
+        # A changed entry is formatted again
+        self.create_test_file("refs.bib", "@book{Jones2019,\n  title={Second Guide},\n  author={Jones, Bob},\n  year={2019}\n}\n")
+        self.assertIn("Second Guide", processor._create_bibitem_content(processor._parse_bib_file()))
+    
+    def test_bibitem_cache_is_bounded(self):
+        """Test that least recently used bibitems are dropped beyond BIBITEM_CACHE_SIZE"""
+        bib_file = self.create_test_file("refs.bib", "".join(
+            f"@misc{{Key{i},\n  title={{Title {i}}},\n  year={{2020}}\n}}\n" for i in range(4)
+        ))
+        
+        processor = LaTeXProcessor("dummy.tex")
+        processor.bib_file = bib_file
+        processor.cited_keys = ['Key0', 'Key1', 'Key2', 'Key3']
+        with patch.object(LaTeXProcessor, 'BIBITEM_CACHE_SIZE', 2), \
+             patch.object(LaTeXProcessor, '_bibitem_cache', {}) as bibitem_cache:
+            processor._create_bibitem_content(processor._parse_bib_file())
+        
+        self.assertEqual(list(bibitem_cache), ['Key2', 'Key3'])
+    
+    def test_bibitems_shared_between_processors(self):
+        """Test that a new processor reuses bibitems formatted for an unchanged .bib file"""
+        bib_file = self.create_test_file("refs.bib", "@book{Lee2018,\n  title={Notes},\n  author={Lee, Ann},\n  year={2018}\n}\n")
+        
+        first = LaTeXProcessor("dummy.tex")
+        first.bib_file = bib_file
+        first.cited_keys = ['Lee2018']
+        content = first._create_bibitem_content(first._parse_bib_file())
+        
+        second = LaTeXProcessor("dummy.tex")
+        second.bib_file = bib_file
+        second.cited_keys = ['Lee2018']
+        with patch.object(second, '_format_apa_bibitem') as format_bibitem:
+            self.assertEqual(second._create_bibitem_content(second._parse_bib_file()), content)
+        format_bibitem.assert_not_called()
+    
+    def test_bibtex_parsing_at_inside_value(self):
+        """Test that a line-initial '@' inside a field value does not start an entry"""
+        bib_content = (
+            "@misc{A,\n  title={First}\n}\n"
+            "@misc{B,\n  abstract={Contact\n@someone for details},\n  title={Second}\n}\n"
+            "@misc{C,\n  title={Third}\n}\n"
+        )
+        bib_file = self.create_test_file("refs.bib", bib_content)
+        
+        processor = LaTeXProcessor("dummy.tex")
+        processor.bib_file = bib_file
+        entries = processor._parse_bib_file()
+        
+        self.assertEqual(list(entries), ['A', 'B', 'C'])
+        self.assertEqual(entries['B']['title'], 'Second')
+    
+    def test_bibtex_parsing_latin1_crlf(self):
+        """Test reading a Latin-1 encoded .bib file with Windows line endings"""
+        bib_file = self.test_dir / "refs.bib"
+        bib_file.write_bytes("@book{Mueller2018,\r\n  author={M\u00fcller, Hans},\r\n  year={2018}\r\n}\r\n".encode('latin-1'))
+        
+        processor = LaTeXProcessor("dummy.tex")
+        processor.bib_file = bib_file
+        entries = processor._parse_bib_file()
+        
+        self.assertEqual(entries["Mueller2018"]["author"], "M\u00fcller, Hans")
+        self.assertEqual(entries["Mueller2018"]["year"], "2018")
+    
+    def test_utf8_bom_is_dropped(self):
+        """Test that a UTF-8 byte order mark does not leak into the output"""
+        main_file = self.test_dir / "main.tex"
+        main_file.write_bytes("\ufeffBOM main content".encode('utf-8'))
+        
+        output_file = self.test_dir / "output.tex"
+        processor = LaTeXProcessor(str(main_file), str(output_file))
+        processor.process()
+        
+        self.assertEqual(output_file.read_text(encoding='utf-8'), "BOM main content")
+    
     def test_bibtex_parsing_author(self):
         """Test parsing of BibTeX entries"""
         bib_content = r"""
@@ -192,6 +343,52 @@ Also \citet{Brown2021} and multiple \cite{Davis2018,Wilson2022}.
         self.assertEqual(garcia_entry["title"], "{Managing start-up–incumbent digital solution co-creation: a four-phase process for intermediation in innovative contexts}")
         self.assertEqual(garcia_entry["author"], 'Garcia Martin, Patricia Carolina and Sj{\\"{o}}din, David and Nair, Sujith and Parida, Vinit')
         self.assertEqual(garcia_entry["year"], "2024")
+        # Fields unused by APA formatting are skipped
+        self.assertNotIn("keywords", garcia_entry)
+        self.assertNotIn("issn", garcia_entry)
+
+    def test_bibtex_parsing_quoted_and_bare_values(self):
+        """Test parsing of quoted and bare field values"""
+        bib_content = r"""
+@string{jos = "Journal of Science"}
+
+@article{Quoted2021,
+  title = "A {Quoted} Title",
+  year = 2021,
+  author = {Quote, Quincy}}
+"""
+
+        processor = LaTeXProcessor("dummy.tex")
+        entries = processor._parse_bib_entries(bib_content)
+
+        self.assertEqual(list(entries), ["Quoted2021"])
+        quoted_entry = entries["Quoted2021"]
+        self.assertEqual(quoted_entry["title"], "A {Quoted} Title")
+        self.assertEqual(quoted_entry["year"], "2021")
+        self.assertEqual(quoted_entry["author"], "Quote, Quincy")
+
+    def test_bibtex_parsing_wanted_keys(self):
+        """Test that only wanted entries are parsed when keys are given"""
+        bib_content = r"""
+@article{Cited2020,
+  title = {Cited},
+  note = {contact: someone@example.org}
+}
+
+@article{Uncited2019,
+  title = {Uncited, with an @ sign}
+}
+
+@book{Cited2018,
+  title = {Also Cited}
+}
+"""
+
+        processor = LaTeXProcessor("dummy.tex")
+        entries = processor._parse_bib_entries(bib_content, wanted_keys=frozenset(("Cited2020", "Cited2018")))
+
+        self.assertEqual(list(entries), ["Cited2020", "Cited2018"])
+        self.assertEqual(entries["Cited2018"]["title"], "Also Cited")
 
 
     def test_apa_author_formatting(self):
@@ -291,6 +488,19 @@ This cites \cite{Smith2020} and \cite{Jones2019}.
         
         self.assertIn("% File not found: missing_file", result)
     
+    def test_read_include_ignores_directory_listing(self):
+        """Test that files are read even when the cached listing does not name them"""
+        main_file = self.create_test_file("main.tex", "Main content")
+        processor = LaTeXProcessor(str(main_file))
+        
+        # A listing that misses the name, as for a case or normalization variant
+        processor._dir_listings[self.test_dir] = set()
+        self.assertEqual(processor._process_includes(main_file), "Main content")
+        
+        processor = LaTeXProcessor(str(self.test_dir / "absent.tex"))
+        result = processor._process_includes(processor.main_file)
+        self.assertIn("% File not found:", result)
+    
     def test_circular_inclusion_detection(self):
         """Test detection of circular inclusions"""
         main_content = r"""
@@ -343,25 +553,66 @@ This cites \cite{Smith2020} and \cite{Jones2019}.
         self.assertIn("Chapter 1 without extension", result)
         self.assertIn("Chapter 2 with extension", result)
 
+    def test_include_relative_to_current_file(self):
+        """Test that includes fall back to the including file's directory"""
+        main_content = r"""
+\documentclass{article}
+\begin{document}
+\input{chapters/intro}
+\end{document}
+"""
 
-class TestReferenceHandling(unittest.TestCase):
+        (self.test_dir / "chapters").mkdir()
+        main_file = self.create_test_file("main.tex", main_content)
+        self.create_test_file("chapters/intro.tex", r"\input{details}")
+        self.create_test_file("chapters/details.tex", "Details next to intro")
 
-    def setUp(self):
-        """Set up test environment with temporary directory"""
-        self.test_dir = Path(tempfile.mkdtemp())
-        self.processor = None
-    
-    def tearDown(self):
-        """Clean up test environment"""
-        if self.test_dir.exists():
-            shutil.rmtree(self.test_dir)
+        output_file = self.test_dir / "output.tex"
+        processor = LaTeXProcessor(str(main_file), str(output_file))
+        processor.process()
 
-    def create_test_file(self, filename: str, content: str) -> Path:
-        """Helper to create test files"""
-        file_path = self.test_dir / filename
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        return file_path
+        with open(output_file, 'r', encoding='utf-8') as f:
+            result = f.read()
+
+        self.assertIn("Details next to intro", result)
+        self.assertNotIn("% File not found", result)
+
+    def test_include_resolution_uses_directory_listings(self):
+        """Test that listed includes are resolved without stat calls"""
+        main_content = "\\input{a}\n\\input{b}\n\\input{a}\n\\input{missing}\n"
+        main_file = self.create_test_file("main.tex", main_content)
+        self.create_test_file("a.tex", "A")
+        self.create_test_file("b.tex", "B")
+
+        processor = LaTeXProcessor(str(main_file), str(self.test_dir / "output.tex"))
+        with patch.object(Path, 'exists', autospec=True, return_value=False) as exists:
+            result = processor._process_includes(processor.main_file)
+
+        # Only the name missing from the listing is checked with exists(),
+        # once, as the main and current directory are the same
+        self.assertEqual([call.args[0].name for call in exists.call_args_list], ["missing.tex"])
+        self.assertIn("A", result)
+        self.assertIn("B", result)
+        self.assertIn("% File not found: missing", result)
+
+    def test_include_resolution_falls_back_to_exists(self):
+        """Test that a name missing from every listing is checked with exists()"""
+        self.create_test_file("chapter1.tex", "Chapter content")
+        sub_dir = self.test_dir / "chapters"
+        sub_dir.mkdir()
+        processor = LaTeXProcessor(str(self.test_dir / "main.tex"))
+
+        # Simulate a case-insensitive filesystem, where exists() finds the file
+        with patch.object(Path, 'exists', autospec=True, return_value=True) as exists:
+            self.assertEqual(processor._resolve_include((sub_dir, self.test_dir), "chapter1.tex"),
+                             self.test_dir / "chapter1.tex")
+            exists.assert_not_called()
+            self.assertEqual(processor._resolve_include((self.test_dir, sub_dir), "Chapter1.tex"),
+                             self.test_dir / "Chapter1.tex")
+            exists.assert_called_once()
+
+
+class TestReferenceHandling(_TempDirMixin, unittest.TestCase):
     
     def test_label_extraction_figures(self):
         r"""Test extraction of labels from figures"""
@@ -493,9 +744,7 @@ This references \ref{sec:missing} which does not exist.
         self.assertEqual(len(processor.references), 2)
         
         # Check for undefined reference
-        referenced_labels = set(ref['ref'] for ref in processor.references)
-        undefined = referenced_labels - set(processor.labels.keys())
-        self.assertIn("sec:missing", undefined)
+        self.assertEqual([ref['ref'] for ref in processor.undefined_refs], ["sec:missing"])
     
     def test_unused_labels(self):
         r"""Test detection of unused labels"""
@@ -522,18 +771,34 @@ See Section \ref{sec:used}.
         self.assertIn("sec:unused", processor.labels)
         
         # Check for unused label
-        referenced_labels = set(ref['ref'] for ref in processor.references)
-        unused = set(processor.labels.keys()) - referenced_labels
-        self.assertIn("sec:unused", unused)
-        self.assertNotIn("sec:used", unused)
+        self.assertIn("sec:unused", processor.unused_labels)
+        self.assertNotIn("sec:used", processor.unused_labels)
+    
+    def test_label_stats_without_full_extraction(self):
+        r"""Test that label stats reflect labels and references extracted separately"""
+        content = r"\label{fig:x}\ref{fig:y}"
+        processor = LaTeXProcessor("dummy.tex")
+        processor._extract_labels(content)
+        processor._extract_references(content)
+        
+        stats = processor.get_label_stats()
+        self.assertEqual([ref['ref'] for ref in stats['undefined_references']], ["fig:y"])
+        self.assertEqual(stats['unused_labels'], ["fig:x"])
+        
+        # Later changes are picked up too
+        processor._extract_references(r"\ref{fig:x}")
+        stats = processor.get_label_stats()
+        self.assertEqual(stats['unused_labels'], [])
 
 
 
 class TestBibItemFormatting(unittest.TestCase):
     """Test specific bibliography formatting functionality"""
     
-    def setUp(self):
-        self.processor = LaTeXProcessor("dummy.tex")
+    @classmethod
+    def setUpClass(cls):
+        """Share one processor; the formatting methods keep no state"""
+        cls.processor = LaTeXProcessor("dummy.tex")
 
     def test_article_formatting(self):
         """Test APA formatting for journal articles"""
@@ -595,12 +860,28 @@ class TestBibItemFormatting(unittest.TestCase):
         self.assertIn('Old Paper Without DOI', result)
         self.assertNotIn(r'\url{', result)  # Should not contain any URL
 
+    def test_doi_escaped_underscores(self):
+        """Test that escaped underscores in DOIs are unescaped"""
+        entry = {
+            'entry_type': 'book',
+            'author': 'Author, First',
+            'title': 'Escaped',
+            'year': '2019',
+            'doi': r'10.1057/978-1{\_}390{\\_}1'
+        }
+        
+        result = self.processor._format_apa_bibitem('doi_key', entry)
+        
+        self.assertIn(r'\url{https://doi.org/10.1057/978-1_390_1}', result)
+
 
 class BibtItemParsing(unittest.TestCase):
     """Test cases in BibTeX parsing and formatting"""
     
-    def setUp(self):
-        self.processor = LaTeXProcessor("dummy.tex")
+    @classmethod
+    def setUpClass(cls):
+        """Share one processor; the formatting methods keep no state"""
+        cls.processor = LaTeXProcessor("dummy.tex")
 
 
     def test_short_author_names(self):
@@ -641,25 +922,9 @@ class BibtItemParsing(unittest.TestCase):
         self.assertIn('[Warner and Waeger(2019)]', result)
 
 
-class TestDuplicateDetectionAndCaptions(unittest.TestCase):
+class TestDuplicateDetectionAndCaptions(_TempDirMixin, unittest.TestCase):
     """Tests for duplicate label detection and caption extraction"""
     
-    def setUp(self):
-        """Set up test environment with temporary directory"""
-        self.test_dir = Path(tempfile.mkdtemp())
-    
-    def tearDown(self):
-        """Clean up test environment"""
-        if self.test_dir.exists():
-            shutil.rmtree(self.test_dir)
-    
-    def create_test_file(self, filename: str, content: str) -> Path:
-        """Helper to create test files"""
-        file_path = self.test_dir / filename
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        return file_path
-
     def test_duplicate_label_detection(self):
         """Test detection of duplicate labels"""
         main_content = r"""
@@ -770,8 +1035,8 @@ A & B \\
         processor = LaTeXProcessor(str(main_file), str(output_file))
         processor.process()
         
-        # Extract captions
-        captions = processor.extract_captions(processor.processed_content)
+        # Captions are collected during processing
+        captions = processor.captions
         
         self.assertIn('fig:example', captions)
         self.assertIn('tab:results', captions)
@@ -811,7 +1076,7 @@ A & B \\
         processor = LaTeXProcessor(str(main_file), str(output_file))
         processor.process()
         
-        captions = processor.extract_captions(processor.processed_content)
+        captions = processor.captions
         
         # Check the label without caption
         self.assertIn('fig:no_caption', captions)
@@ -842,12 +1107,31 @@ A & B \\
         processor = LaTeXProcessor(str(main_file), str(output_file))
         processor.process()
         
-        captions = processor.extract_captions(processor.processed_content)
+        captions = processor.captions
         
         self.assertIn('fig:complex', captions)
         # Check that caption contains the formatting commands
         self.assertIn('textbf', captions['fig:complex']['caption'])
         self.assertIn('alpha', captions['fig:complex']['caption'])
+    
+    def test_caption_with_deeply_nested_braces(self):
+        """Test caption extraction with braces nested more than one level deep"""
+        main_content = r"""
+\begin{figure}
+\caption[Short]{Results for \textbf{\emph{all} runs} in {\small {\tt raw}} form}
+\label{fig:deep}
+\end{figure}
+"""
+        
+        main_file = self.create_test_file("main.tex", main_content)
+        processor = LaTeXProcessor(str(main_file), str(self.test_dir / "output.tex"))
+        processor.process()
+        
+        self.assertEqual(
+            processor.captions['fig:deep']['caption'],
+            r"Results for \textbf{\emph{all} runs} in {\small {\tt raw}} form"
+        )
+        self.assertEqual(processor.captions['fig:deep']['type'], 'figure')
 
     def test_bibtex_export_mode(self):
         """Test bibtex export mode extracts only referenced entries"""
@@ -904,25 +1188,77 @@ Some text citing \cite{Smith2020} and \cite{Jones2019}.
         # Should NOT contain uncited entry
         self.assertNotIn('Brown2021', result)
 
-
-class TestBibLaTeXProcessing(unittest.TestCase):
-    """Test BibLaTeX-style bibliography processing"""
+    def test_full_mode_without_citations_skips_bib_file(self):
+        """Test full mode does not read the .bib file when nothing is cited"""
+        main_file = self.create_test_file("main.tex", "No citations\n\\bibliography{refs}\n")
+        self.create_test_file("refs.bib", "@article{Unused,\n    title = {Unused}\n}\n")
+        output_file = self.test_dir / "output.tex"
+        
+        processor = LaTeXProcessor(str(main_file), str(output_file))
+        with patch('latex_processor._read_text', wraps=_read_text) as read_text:
+            processor.process()
+        
+        read_paths = [call.args[0] for call in read_text.call_args_list]
+        self.assertNotIn(self.test_dir / "refs.bib", read_paths)
+        self.assertNotIn('Unused', output_file.read_text(encoding='utf-8'))
     
-    def setUp(self):
-        """Set up test environment with temporary directory"""
-        self.test_dir = Path(tempfile.mkdtemp())
+    def test_bibtex_export_inline_closing_brace(self):
+        """Test exported entries end at their matching brace, not at the next line-initial brace"""
+        bib_content = "@article{Inline,\n    title = {Inline {Nested} Close}}\n@article{Next,\n    title = {Next}\n}\n"
+        
+        main_file = self.create_test_file("main.tex", "x")
+        processor = LaTeXProcessor(str(main_file), str(self.test_dir / "output.bib"), mode='bibtex')
+        result = processor._extract_referenced_bibtex_entries(bib_content, ['Inline'])
+        
+        self.assertEqual(result, "@article{Inline,\n    title = {Inline {Nested} Close}}")
     
-    def tearDown(self):
-        """Clean up test environment"""
-        if self.test_dir.exists():
-            shutil.rmtree(self.test_dir)
+    def test_bibtex_export_without_citations(self):
+        """Test the .bib file is not read when nothing is cited"""
+        main_file = self.create_test_file("main.tex", "No citations\n\\bibliography{refs}\n")
+        self.create_test_file("refs.bib", "@article{Unused,\n    title = {Unused}\n}\n")
+        output_file = self.test_dir / "output.bib"
+        
+        processor = LaTeXProcessor(str(main_file), str(output_file), mode='bibtex')
+        with patch('latex_processor._read_text', wraps=_read_text) as read_text:
+            processor.process()
+        
+        read_paths = [call.args[0] for call in read_text.call_args_list]
+        self.assertNotIn(self.test_dir / "refs.bib", read_paths)
+        self.assertEqual(output_file.read_text(encoding='utf-8'), '')
     
-    def create_test_file(self, filename: str, content: str) -> Path:
-        """Helper to create test files"""
-        file_path = self.test_dir / filename
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        return file_path
+    def test_bibtex_export_citation_order(self):
+        """Test exported entries follow citation order and skip missing keys"""
+        bib_content = r"""
+@article{First,
+    title = {First Paper}
+}
+
+@article{Second,
+    title = {Second Paper}
+}
+"""
+        
+        main_file = self.create_test_file("main.tex", "x")
+        processor = LaTeXProcessor(str(main_file), str(self.test_dir / "output.bib"), mode='bibtex')
+        with patch('builtins.print') as mock_print:
+            result = processor._extract_referenced_bibtex_entries(bib_content, ['Second', 'Missing', 'First', 'Gone'])
+        
+        self.assertTrue(result.startswith('@article{Second,'))
+        self.assertLess(result.index('Second Paper'), result.index('First Paper'))
+        self.assertNotIn('Missing', result)
+        mock_print.assert_called_once_with("Warning: 2 entries not found in bibliography: Missing, Gone")
+
+
+class TestBibLaTeXProcessing(_TempDirMixin, unittest.TestCase):
+    """Test BibLaTeX-style bibliography processing"""
+    
+    def assertAllIn(self, needles, haystack):
+        """Assert that all needles occur in haystack, in the given order"""
+        idx = 0
+        for needle in needles:
+            pos = haystack.find(needle, idx)
+            self.assertGreaterEqual(pos, 0, f"{needle!r} not found in order")
+            idx = pos + len(needle)
     
     def test_biblatex_style_processing(self):
         """Test BibLaTeX-style bibliography with \\addbibresource and \\printbibliography"""
@@ -1123,6 +1459,12 @@ This cites \cite{Smith2020}.
         self.assertIn(r"\reftitle{References}", biblatex_result)
         self.assertIn(r"\begin{thebibliography}{99}", biblatex_result)
     
+    def test_biblatex_without_addbibresource_returns_pieces(self):
+        r"""Test that content without \addbibresource comes back as a single piece"""
+        content = "\\printbibliography\n"
+        processor = LaTeXProcessor("dummy.tex")
+        self.assertEqual(processor._process_bibliography_biblatex(content), [content])
+    
     def test_biblatex_multiple_citations(self):
         """Test BibLaTeX with multiple citations in order"""
         main_content = r"""
@@ -1167,18 +1509,8 @@ First \cite{Zebra2020}, then \cite{Alpha2019}, and \cite{Beta2021}.
         with open(output_file, 'r', encoding='utf-8') as f:
             result = f.read()
         
-        # All citations should be present
-        self.assertIn("Zebra2020", result)
-        self.assertIn("Alpha2019", result)
-        self.assertIn("Beta2021", result)
-        
-        # Should be in citation order (not alphabetical)
-        zebra_pos = result.find("Zebra2020")
-        alpha_pos = result.find("Alpha2019")
-        beta_pos = result.find("Beta2021")
-        
-        self.assertLess(zebra_pos, alpha_pos)
-        self.assertLess(alpha_pos, beta_pos)
+        # All citations should be present, in citation order (not alphabetical)
+        self.assertAllIn(["Zebra2020", "Alpha2019", "Beta2021"], result)
 
 
 if __name__ == '__main__':